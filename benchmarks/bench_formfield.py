@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+嵌套FormField的性能基准测试
+
+在仓库根目录下运行：
+
+    python -m benchmarks.bench_formfield --depth 1 2 3 --siblings 1 4 --fields 5 20
+
+对每一组(嵌套深度, 同级FormField数量, inner field数量, bound/unbound)参数，
+分别测量外层Form的构建、inner form构建、校验、渲染以及ModelForm保存的
+耗时、内存峰值和SQL查询数量。使用内存中的SQLite数据库。
+"""
+
+import argparse
+import itertools
+import statistics
+import sys
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+
+
+def setup_django():
+    if not settings.configured:
+        settings.configure(
+            DEBUG=False,
+            SECRET_KEY='benchmark',
+            INSTALLED_APPS=[
+                'django.contrib.contenttypes',
+                'django.contrib.auth',
+                'form_field_utils',
+                'test',
+            ],
+            DATABASES={
+                'default': {
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': ':memory:',
+                },
+            },
+            TEMPLATES=[{
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'APP_DIRS': True,
+            }],
+        )
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def build_form_class(depth, siblings, fields, path='f'):
+    # 每个位置使用不同的form class，保证各个inner form的prefix不冲突
+    from django import forms
+    from form_field_utils.fields import FormField
+    from form_field_utils.forms import FormFieldSupportMixin
+
+    attrs = {'field_{}'.format(i): forms.CharField(max_length=100) for i in range(fields)}
+    if depth > 0:
+        for j in range(siblings):
+            inner_path = '{}{}'.format(path, j)
+            inner_class = build_form_class(depth - 1, siblings, fields, inner_path)
+            attrs['form_field_{}'.format(j)] = FormField(inner_class, prefix=inner_path)
+    return type('BenchForm_{}'.format(path), (FormFieldSupportMixin, forms.Form), attrs)
+
+
+def build_data(form_class, prefix=None):
+    from form_field_utils.fields import BaseFormField
+
+    data = {}
+    for name, field in form_class.base_fields.items():
+        if isinstance(field, BaseFormField):
+            data.update(build_data(field.form_class, field.prefix))
+        else:
+            key = '{}-{}'.format(prefix, name) if prefix else name
+            data[key] = 'value'
+    return data
+
+
+def iter_inner_forms(form):
+    for name in form.form_fields:
+        inner_form = form[name].inner_form
+        yield inner_form
+        if hasattr(inner_form, 'form_fields'):
+            yield from iter_inner_forms(inner_form)
+
+
+def measure(func, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for _ in range(repeat):
+        setup = func()
+        start = time.perf_counter()
+        setup()
+        timings.append(time.perf_counter() - start)
+
+    setup = func()
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        setup()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak, len(queries)
+
+
+def scenarios(form_class, data, bound):
+    # 每个scenario返回一个准备函数，准备函数返回被测量的函数，
+    # 使得准备工作(例如构建外层Form)不计入测量
+    args = (data,) if bound else ()
+
+    def construct():
+        return lambda: form_class(*args)
+
+    def inner_form():
+        form = form_class(*args)
+        return lambda: list(iter_inner_forms(form))
+
+    def validate():
+        form = form_class(*args)
+        return form.is_valid
+
+    def render():
+        form = form_class(*args)
+        return form.as_table
+
+    yield 'construct', construct
+    yield 'inner_form', inner_form
+    if bound:
+        yield 'validate', validate
+    yield 'render', render
+
+
+def save_scenarios(count):
+    from django.db import transaction
+    from form_field_utils.bulk import bulk_save
+    from test.forms import CaseModelForm
+
+    def get_forms():
+        case_forms = [
+            CaseModelForm({'name': 'case {}'.format(i), 'no': 'no {}'.format(i)})
+            for i in range(count)
+        ]
+        for case_form in case_forms:
+            case_form.is_valid()
+        return case_forms
+
+    def rollback(func):
+        def wrapper():
+            with transaction.atomic():
+                func()
+                transaction.set_rollback(True)
+        return wrapper
+
+    def save():
+        case_forms = get_forms()
+        return rollback(lambda: [case_form.save() for case_form in case_forms])
+
+    def bulk():
+        case_forms = get_forms()
+        return rollback(lambda: bulk_save(case_forms))
+
+    yield 'save', save
+    yield 'bulk_save', bulk
+
+
+def format_row(columns):
+    return '  '.join(str(column).ljust(width) for column, width in zip(columns, WIDTHS))
+
+
+HEADER = ('depth', 'siblings', 'fields', 'state', 'operation', 'time (ms)', 'peak (KiB)', 'queries')
+WIDTHS = (6, 9, 7, 8, 11, 10, 11, 7)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--siblings', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--fields', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--states', nargs='+', choices=['bound', 'unbound'],
+                        default=['unbound', 'bound'])
+    parser.add_argument('--save-count', type=int, default=100,
+                        help='number of outer ModelForms saved by the save benchmarks')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='also write the report to this file')
+    options = parser.parse_args(argv)
+
+    setup_django()
+
+    lines = [format_row(HEADER)]
+    print(lines[0])
+
+    def report(*columns):
+        line = format_row(columns)
+        lines.append(line)
+        print(line)
+
+    for depth, siblings, fields in itertools.product(options.depth, options.siblings, options.fields):
+        form_class = build_form_class(depth, siblings, fields)
+        data = build_data(form_class)
+        for state in options.states:
+            for operation, func in scenarios(form_class, data, state == 'bound'):
+                elapsed, peak, queries = measure(func, options.repeat)
+                report(depth, siblings, fields, state, operation,
+                       '{:.3f}'.format(elapsed * 1000), '{:.1f}'.format(peak / 1024), queries)
+
+    for operation, func in save_scenarios(options.save_count):
+        elapsed, peak, queries = measure(func, max(options.repeat // 4, 1))
+        report(1, 1, '-', 'bound', operation,
+               '{:.3f}'.format(elapsed * 1000), '{:.1f}'.format(peak / 1024), queries)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
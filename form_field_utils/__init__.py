@@ -0,0 +1 @@
+default_app_config = 'form_field_utils.apps.FormFieldUtilsConfig'
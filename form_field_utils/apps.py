@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+class FormFieldUtilsConfig(AppConfig):
+    name = 'form_field_utils'
+    verbose_name = 'Form Field Utils'
+
+    def ready(self):
+        # 设置了FORM_FIELD_UTILS_WARM_UP时，在worker处理请求之前预热所有表单，
+        # 存在配置错误时直接启动失败
+        if not getattr(settings, 'FORM_FIELD_UTILS_WARM_UP', False):
+            return
+
+        from .warmup import warm_up
+        errors = ['{}: {}'.format(result.path, result.error)
+                  for result in warm_up() if result.error is not None]
+        if errors:
+            raise ImproperlyConfigured('\n'.join(errors))
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+批量保存多个ModelFormFieldSupportMixin表单
+"""
+
+import math
+from collections import OrderedDict
+
+from django.db import connections, router, transaction
+from django.db.models import AutoField, Case, Value, When
+from django.db.models.deletion import Collector
+
+
+def can_return_pks_from_bulk_insert(model):
+    # Django 3.0之后该feature更名为can_return_rows_from_bulk_insert
+    features = connections[router.db_for_write(model)].features
+    return getattr(features, 'can_return_rows_from_bulk_insert', False) or \
+        getattr(features, 'can_return_ids_from_bulk_insert', False)
+
+
+def bulk_update(model, objs, fields, batch_size=None):
+    # Django 2.2之前没有QuerySet.bulk_update
+    # 每个batch使用一条UPDATE ... CASE WHEN语句
+    manager = model._default_manager
+    if hasattr(manager, 'bulk_update'):
+        manager.bulk_update(objs, [f.name for f in fields], batch_size=batch_size)
+        return
+    objs = list(objs)
+    if not objs or not fields:
+        return
+    batch_size = batch_size or len(objs)
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        values = {}
+        for field in fields:
+            whens = [
+                When(pk=obj.pk, then=Value(field.pre_save(obj, False), output_field=field))
+                for obj in batch
+            ]
+            values[field.attname] = Case(*whens, output_field=field)
+        manager.filter(pk__in=[obj.pk for obj in batch]).update(**values)
+
+
+def _split_creates(model, creates, need_pk):
+    # 返回(逐个INSERT的instance, 使用bulk_create的instance)
+    if model._meta.parents:
+        # multi-table继承的model无法bulk_create
+        return creates, []
+    if can_return_pks_from_bulk_insert(model):
+        return [], creates
+    need_pk = set(id(obj) for obj in need_pk)
+    single_creates = [obj for obj in creates if obj.pk is None and id(obj) in need_pk]
+    bulk_creates = [obj for obj in creates if obj.pk is not None or id(obj) not in need_pk]
+    return single_creates, bulk_creates
+
+
+def _update_fields(model):
+    return [f for f in model._meta.concrete_fields if not f.primary_key]
+
+
+def bulk_write(model, objs, need_pk=(), batch_size=None):
+    """
+    将同一个model的instance写入数据库：
+    新建的instance使用bulk_create，已存在的instance使用bulk_update。
+
+    need_pk中的instance在写入后必须拥有pk(例如需要关联inner instance)，
+    当数据库不支持bulk_create返回pk时，只能逐个INSERT。
+    """
+    creates = [obj for obj in objs if obj._state.adding]
+    updates = [obj for obj in objs if not obj._state.adding]
+
+    if creates:
+        single_creates, bulk_creates = _split_creates(model, creates, need_pk)
+        for obj in single_creates:
+            obj.save(force_insert=True)
+        if bulk_creates:
+            db = router.db_for_write(model)
+            model._default_manager.db_manager(db).bulk_create(bulk_creates, batch_size=batch_size)
+            for obj in bulk_creates:
+                obj._state.adding = False
+                obj._state.db = db
+
+    if updates:
+        bulk_update(model, updates, _update_fields(model), batch_size=batch_size)
+
+
+def _batch_count(count, batch_size):
+    return int(math.ceil(count / float(batch_size))) if count else 0
+
+
+def planned_write_count(model, objs, need_pk=(), batch_size=None):
+    """
+    bulk_write(model, objs, need_pk, batch_size)将执行的查询数
+    """
+    connection = connections[router.db_for_write(model)]
+    opts = model._meta
+    creates = [obj for obj in objs if obj._state.adding]
+    updates = [obj for obj in objs if not obj._state.adding]
+    count = 0
+
+    single_creates, bulk_creates = _split_creates(model, creates, need_pk)
+    # multi-table继承时每个parent表各一条INSERT
+    count += len(single_creates) * (len(opts.get_parent_list()) + 1)
+    # 同QuerySet.bulk_create：有pk和没有pk的instance分开插入
+    for with_pk in (True, False):
+        batch = [obj for obj in bulk_creates if (obj.pk is not None) is with_pk]
+        if not batch:
+            continue
+        fields = opts.concrete_fields if with_pk else \
+            [f for f in opts.concrete_fields if not isinstance(f, AutoField)]
+        size = batch_size or max(connection.ops.bulk_batch_size(fields, batch), 1)
+        count += _batch_count(len(batch), size)
+
+    fields = _update_fields(model)
+    if updates and fields:
+        if hasattr(model._default_manager, 'bulk_update'):
+            max_size = connection.ops.bulk_batch_size(['pk', 'pk'] + fields, updates)
+            size = min(batch_size, max_size) if batch_size else max_size
+        else:
+            size = batch_size or len(updates)
+        count += _batch_count(len(updates), max(size, 1))
+    return count
+
+
+def _needs_pk(form):
+    # outer instance需要pk的情况：
+    # 存在需要关联的inner instance，或者存在需要保存的many-to-many数据
+    if getattr(form, 'modelform_fields', None) or getattr(form, 'modelformset_fields', None):
+        return True
+    return any(f.name in form.cleaned_data for f in form._meta.model._meta.many_to_many)
+
+
+def _get_cached_related(field, obj):
+    if hasattr(field, 'get_cached_value'):
+        # Django 2.0+
+        return field.get_cached_value(obj, default=None)
+    return getattr(obj, field.get_cache_name(), None)
+
+
+def _sync_related_pks(obj):
+    # 规划时关联的outer instance可能还没有pk，写入前使用其最新的pk
+    for field in obj._meta.concrete_fields:
+        if not field.is_relation or not (field.many_to_one or field.one_to_one):
+            continue
+        related = _get_cached_related(field, obj)
+        if related is not None and related.pk is not None and \
+                getattr(obj, field.attname) != related.pk:
+            setattr(obj, field.attname, related.pk)
+
+
+class SavePlan(object):
+    """
+    规划多个已经通过校验的ModelFormFieldSupportMixin表单的保存。
+
+    inner instance的外键指向outer instance，因此按照嵌套层级排列写入顺序：
+    每一层中同一个model的instance通过一次bulk_write写入，
+    各formset中被删除的对象在最开始按照model各使用一条DELETE删除。
+    execute()在一个transaction中完成全部写入，各层之间不使用savepoint。
+    """
+
+    def __init__(self, forms, batch_size=None):
+        self.forms = list(forms)
+        self.batch_size = batch_size
+        for form in self.forms:
+            if form.errors:
+                raise ValueError(
+                    "The %s could not be %s because the data didn't validate." % (
+                        form.instance._meta.object_name,
+                        'created' if form.instance._state.adding else 'changed',
+                    )
+                )
+        self.deletes = OrderedDict()
+        self.levels = []
+        self._related_fields = {}
+        self._build()
+
+    def _build(self):
+        level = self.forms
+        while level:
+            writes = OrderedDict()
+            next_level = []
+            for form in level:
+                objs, need_pk = writes.setdefault(type(form.instance), ([], []))
+                objs.append(form.instance)
+                if _needs_pk(form):
+                    need_pk.append(form.instance)
+                if not hasattr(form, 'modelform_fields'):
+                    continue
+
+                # modelform_fields的关联在outer instance写入之后建立(同save_related)
+                names = [name for name in form.modelform_fields
+                         if not form[name].is_absent() and not form[name].is_unchanged()]
+                self._related_fields[id(form)] = names
+                next_level.extend(form[name].inner_form for name in names)
+                for name in form.modelformset_fields:
+                    if form[name].is_absent():
+                        continue
+                    formset = form[name].inner_form
+                    save_forms, deleted = formset.get_bulk_save_forms()
+                    next_level.extend(save_forms)
+                    self.deletes.setdefault(formset.model, []).extend(deleted)
+            self.levels.append((level, writes))
+            level = next_level
+
+    def _iter_delete_querysets(self):
+        for model, objs in self.deletes.items():
+            if objs:
+                yield model._default_manager.filter(pk__in=[obj.pk for obj in objs])
+
+    @property
+    def has_cascading_deletes(self):
+        """
+        存在不能直接DELETE的对象(级联删除、信号等)时，
+        Collector的查询数取决于数据库中的关联对象，planned_query_count只是下限
+        """
+        return any(
+            not Collector(using=queryset.db).can_fast_delete(queryset)
+            for queryset in self._iter_delete_querysets()
+        )
+
+    @property
+    def planned_query_count(self):
+        """
+        execute()将执行的查询数，不包括transaction/savepoint语句以及many-to-many的保存。
+        has_cascading_deletes为True时为下限
+        """
+        count = 0
+        for queryset in self._iter_delete_querysets():
+            # 不能直接删除时Collector至少还需要一次SELECT，
+            # 级联关系的SELECT以及关联model的DELETE不计入
+            count += 1 if Collector(using=queryset.db).can_fast_delete(queryset) else 2
+        for level, writes in self.levels:
+            for model, (objs, need_pk) in writes.items():
+                count += planned_write_count(model, objs, need_pk, self.batch_size)
+        return count
+
+    def execute(self):
+        with transaction.atomic():
+            # 每个model只使用一条DELETE
+            for model, objs in self.deletes.items():
+                if objs:
+                    model._default_manager.filter(pk__in=[obj.pk for obj in objs]).delete()
+
+            for level, writes in self.levels:
+                for model, (objs, need_pk) in writes.items():
+                    for obj in objs:
+                        _sync_related_pks(obj)
+                    bulk_write(model, objs, need_pk, batch_size=self.batch_size)
+
+                for form in level:
+                    form._save_m2m()
+                    if not hasattr(form, 'modelform_fields'):
+                        continue
+                    form.before_save_related()
+                    for name in self._related_fields[id(form)]:
+                        setattr(form.instance, name, form[name].inner_form.instance)
+
+        return [form.instance for form in self.forms]
+
+
+def bulk_save(forms, batch_size=None):
+    """
+    批量保存多个已经通过校验的ModelFormFieldSupportMixin表单。
+
+    按照嵌套层级逐层保存：每一层中同一个model的instance一起写入，
+    再在内存中建立inner instance和outer instance的关联(同save_related)。
+    不会调用各个form的save()和model的save()，也不会发送pre_save/post_save信号。
+    """
+    return SavePlan(forms, batch_size).execute()
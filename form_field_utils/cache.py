@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+缓存FormField在构建inner form时使用的form class
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.core.cache import caches
+from django.core.exceptions import FieldError, ImproperlyConfigured
+from django.forms.formsets import formset_factory
+from django.forms.models import ModelForm, inlineformset_factory, modelform_factory
+
+
+COMPILED_FORM_CLASS_CACHE_SIZE = 256
+
+_modelform_classes = {}
+
+
+@lru_cache(maxsize=COMPILED_FORM_CLASS_CACHE_SIZE)
+def get_compiled_form_class(form_class, required=True, disabled=False, prefix=None, exclude=()):
+    # 按照(form_class, required, disabled, prefix, exclude)生成form_class的子类，
+    # 子类的base_fields已经设置好了required和disabled，并去掉了exclude中的field，
+    # 使得实例化inner form时不再需要逐个修改field
+    if required and not disabled and prefix is None and not exclude:
+        return form_class
+
+    base_fields = copy.deepcopy(form_class.base_fields)
+    for name in exclude:
+        base_fields.pop(name, None)
+    for field in base_fields.values():
+        if not required:
+            field.required = False
+        if disabled:
+            field.disabled = True
+
+    attrs = {
+        '__module__': form_class.__module__,
+        '__qualname__': form_class.__qualname__,
+    }
+    if prefix is not None:
+        attrs['prefix'] = prefix
+
+    compiled_class = type(form_class)(form_class.__name__, (form_class,), attrs)
+    compiled_class.base_fields = base_fields
+    return compiled_class
+
+
+@lru_cache(maxsize=COMPILED_FORM_CLASS_CACHE_SIZE)
+def get_formset_class(form_class, formset, options, parent_model=None, fk_name=None):
+    # options为formset_factory参数组成的tuple，使得可以作为缓存的key
+    options = dict(options)
+    if parent_model is None:
+        return formset_factory(form_class, formset=formset, **options)
+    return inlineformset_factory(
+        parent_model, form_class._meta.model, form=form_class,
+        formset=formset, fk_name=fk_name, **options
+    )
+
+
+def clear_compiled_form_class_cache():
+    get_compiled_form_class.cache_clear()
+    get_formset_class.cache_clear()
+
+
+def get_modelform_class(model, fields, form=ModelForm):
+    # 相同(model, fields)的ModelFormField共用同一个modelform_factory生成的class
+    key = (model, tuple(fields), form)
+    try:
+        return _modelform_classes[key]
+    except KeyError:
+        form_class = modelform_factory(model, form=form, fields=list(fields))
+        return _modelform_classes.setdefault(key, form_class)
+
+
+def warm_modelform_cache(declarations, form=ModelForm, fail_silently=False):
+    """
+    预先生成declarations中(model, fields)对应的ModelForm class。
+    fail_silently为True时忽略配置错误，错误会在使用ModelFormField时再抛出。
+    """
+    for model, fields in declarations:
+        try:
+            get_modelform_class(model, fields, form)
+        except (AttributeError, FieldError, ImproperlyConfigured):
+            if not fail_silently:
+                raise
+
+
+def clear_modelform_cache():
+    _modelform_classes.clear()
+
+
+class LocMemRenderCache(object):
+    """
+    进程内的LRU缓存，最多保存maxsize个渲染结果
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, html):
+        with self._lock:
+            self._data[key] = html
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoRenderCache(object):
+    """
+    使用Django cache framework保存渲染结果
+    """
+
+    def __init__(self, alias='default', timeout=None, key_prefix='form_field_utils.render'):
+        self.alias = alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self):
+        return '{}:version'.format(self.key_prefix)
+
+    def get_version(self):
+        # clear()只增加key_prefix的版本号，不影响同一个cache中的其他数据
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self.cache.add(self.version_key, 1, None)
+            version = self.cache.get(self.version_key, 1)
+        return version
+
+    def make_key(self, key):
+        return '{}:{}:{}'.format(self.key_prefix, self.get_version(), key)
+
+    def get(self, key):
+        return self.cache.get(self.make_key(key))
+
+    def set(self, key, html):
+        self.cache.set(self.make_key(key), html, self.timeout)
+
+    def clear(self):
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.set(self.version_key, 2, None)
+
+
+default_render_cache = LocMemRenderCache()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+按照prefix对outer form的data进行分区
+
+每个outer form的data只建立一次PrefixIndex，
+inner form拿到的是只包含自己prefix下的键的PrefixedData视图，不复制任何值。
+"""
+
+from collections.abc import Mapping
+
+
+class PrefixIndex(object):
+    def __init__(self, data):
+        self.data = data
+        self._index = None
+
+    @property
+    def index(self):
+        # 第一次使用时建立索引：
+        # 'a-b-c'会被记录在'a'和'a-b'两个prefix下
+        if self._index is None:
+            index = {}
+            for key in self.data:
+                pos = key.find('-')
+                while pos != -1:
+                    index.setdefault(key[:pos], set()).add(key)
+                    pos = key.find('-', pos + 1)
+            self._index = {prefix: frozenset(keys) for prefix, keys in index.items()}
+        return self._index
+
+    def has_prefix(self, prefix):
+        if prefix is None:
+            return bool(self.data)
+        return prefix in self.index
+
+    def view(self, prefix):
+        if prefix is None:
+            return PrefixedData(self, None)
+        return PrefixedData(self, self.index.get(prefix, frozenset()))
+
+
+class PrefixedData(Mapping):
+    """
+    outer form data的只读视图，keys为None时包含全部的键。
+    """
+
+    def __init__(self, index, keys):
+        self.index = index
+        self._keys = keys
+
+    def __getitem__(self, key):
+        if self._keys is not None and key not in self._keys:
+            raise KeyError(key)
+        return self.index.data[key]
+
+    def __contains__(self, key):
+        if self._keys is None:
+            return key in self.index.data
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self.index.data if self._keys is None else self._keys)
+
+    def __len__(self):
+        return len(self.index.data if self._keys is None else self._keys)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self.index.data.get(key, default)
+        return default
+
+    @property
+    def getlist(self):
+        # 只有原始data是QueryDict时才提供getlist，
+        # 使得widget对plain dict的处理保持不变
+        getlist = self.index.data.getlist
+
+        def _getlist(key, default=None):
+            if key in self:
+                return getlist(key, default)
+            return [] if default is None else default
+        return _getlist
+
+    def __repr__(self):
+        return '<{}: {!r}>'.format(self.__class__.__name__, dict(self.items()))
+
+
+def get_data_index(data):
+    if isinstance(data, PrefixedData):
+        return data.index
+    return PrefixIndex(data)
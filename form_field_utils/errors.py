@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+嵌套FormField的错误
+
+inner form的错误被包装为NestedValidationError：保存从FormField开始的path以及原有的错误，
+message使用format_lazy，只有在渲染时才会格式化，也不会修改inner form中的错误对象。
+NestedErrorDict按照path还原嵌套结构，可以直接序列化为JSON。
+"""
+
+import json
+
+from django.core.exceptions import ValidationError
+from django.forms.utils import ErrorDict
+from django.utils.encoding import force_text
+from django.utils.html import escape
+from django.utils.text import format_lazy
+
+
+NON_FIELD_ERRORS = '__all__'
+
+
+class NestedValidationError(ValidationError):
+    def __init__(self, path, error, message):
+        super().__init__(message, code=error.code, params=error.params)
+        self.path = tuple(path) + getattr(error, 'path', ())
+        self.error = error
+
+    @property
+    def leaf(self):
+        # 最内层field的原始错误
+        error = self.error
+        while isinstance(error, NestedValidationError):
+            error = error.error
+        return error
+
+
+def wrap_form_field_errors(errors):
+    """
+    errors为inner form的(name, [ValidationError, ...])，
+    返回包装后的ValidationError list，用于FormField的to_python()
+    """
+    error_list = []
+    for name, field_errors in errors:
+        for error in field_errors:
+            if hasattr(error, 'message'):
+                error = NestedValidationError(
+                    (name,), error, format_lazy('Field {} in FormField: {}', name, error.message)
+                )
+            error_list.append(error)
+    return error_list
+
+
+def wrap_formset_field_errors(index, errors):
+    # 同wrap_form_field_errors，index为formset中form的序号
+    error_list = []
+    for name, field_errors in errors:
+        for error in field_errors:
+            if hasattr(error, 'message'):
+                error = NestedValidationError(
+                    (index, name), error,
+                    format_lazy('Field {} of form {} in FormSetField: {}', name, index, error.message)
+                )
+            error_list.append(error)
+    return error_list
+
+
+def _get_message(error):
+    message = error.message
+    if error.params:
+        message %= error.params
+    return force_text(message)
+
+
+class NestedErrorDict(ErrorDict):
+    """
+    按照NestedValidationError的path还原为嵌套的结构：
+
+        {'form_field': {'inner_field': [{'message': ..., 'code': ...}]}}
+
+    同一层中既有field的错误又有自身的错误时，自身的错误放在'__all__'中。
+    """
+
+    def get_json_data(self, escape_html=False):
+        tree = {}
+        for field, errors in self.items():
+            for error in errors.as_data():
+                path = (field,) + getattr(error, 'path', ())
+                leaf = error.leaf if isinstance(error, NestedValidationError) else error
+                message = _get_message(leaf)
+                node = tree
+                for key in path[:-1]:
+                    child = node.get(key)
+                    if child is None:
+                        child = node[key] = {}
+                    elif isinstance(child, list):
+                        child = node[key] = {NON_FIELD_ERRORS: child}
+                    node = child
+                key = path[-1]
+                if isinstance(node.get(key), dict):
+                    node, key = node[key], NON_FIELD_ERRORS
+                node.setdefault(key, []).append({
+                    'message': escape(message) if escape_html else message,
+                    'code': leaf.code or '',
+                })
+        return tree
+
+    def as_json(self, escape_html=False):
+        return json.dumps(self.get_json_data(escape_html))
@@ -1,24 +1,60 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import hashlib
+import itertools
+import json
 import warnings
+from collections.abc import Mapping
+from functools import lru_cache
 
-from django.forms.fields import Field, BoundField
-from django.forms import Form, ModelForm, modelform_factory
+from django.forms.fields import Field, FileField, BoundField
+from django.forms import Form, ModelForm
+from django.forms.formsets import BaseFormSet, TOTAL_FORM_COUNT, INITIAL_FORM_COUNT
+from django.forms.widgets import Widget
 from django.utils.module_loading import import_string
-from django.core.exceptions import ImproperlyConfigured, ValidationError, FieldError
-from django.utils.functional import cached_property
+from django.core.exceptions import (
+    ImproperlyConfigured, ValidationError, FieldError, FieldDoesNotExist
+)
+from django.utils.encoding import force_text
+from django.utils.functional import cached_property, Promise
 from django.utils.deprecation import RemovedInDjango21Warning
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
 from django.utils.inspect import func_accepts_kwargs, func_supports_parameter
 from django.db.models import Model
 
-from .widgets import FormInput
+from .errors import wrap_form_field_errors, wrap_formset_field_errors
+from .cache import (
+    get_compiled_form_class, get_formset_class, get_modelform_class, default_render_cache,
+    COMPILED_FORM_CLASS_CACHE_SIZE
+)
+from .formsets import BulkInlineFormSet
+from .tracing import traced, get_form_path
+from .widgets import FormInput, FormSetInput
+
+
+def _bound_field_tags(bound_field, *args, **kwargs):
+    return bound_field.path, bound_field.field.form_class
+
+
+def _field_tags(field, *args, **kwargs):
+    bound_field = field.bound_field
+    return bound_field.path if bound_field is not None else (), field.form_class
+
+
+def _render_cache_key_default(obj):
+    # 只接受lazy translation的文本，渲染时的语言已经包含在key中
+    if isinstance(obj, Promise):
+        return force_text(obj)
+    raise TypeError('{!r} is not JSON serializable'.format(obj))
 
 
 class BoundFormField(BoundField):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._inner_form = None
+        self._inner_form_disabled = None
 
     def __getitem__(self, name):
         return self.inner_form[name]
@@ -26,11 +62,12 @@ class BoundFormField(BoundField):
     def __iter__(self):
         return iter(self.inner_form)
 
-    @property
+    @cached_property
     def data(self):
         # 委托到inner form各field上取值
         # 对于多层嵌套的FormField实现了递归取值
         # 而不需要在POST数据中根据键来构建dict（需要实现递归逻辑）
+        # 每个bound field只计算一次，data或initial变化后需要调用invalidate()
         return {name: self.inner_form[name].data for name in self.inner_form.fields}
 
     @property
@@ -38,34 +75,134 @@ class BoundFormField(BoundField):
         return self.inner_form.fields
 
     @property
-    def inner_form(self):
-        if self._inner_form is not None:
-            for field in self._inner_form.fields.values():
-                field.disabled = self.field.disabled
-            return self._inner_form
-        else:
-            return self._get_form()
+    def nested(self):
+        # outer form以嵌套dict(例如JSON)的形式接收数据
+        return getattr(self.form, 'nested', False)
+
+    @cached_property
+    def path(self):
+        # 从最外层form到当前FormField的field name组成的tuple
+        return get_form_path(self.form) + (self.name,)
 
+    @property
+    def inner_form(self):
+        # 每个outer form实例只构建一次inner form
+        # 渲染、校验以及保存都使用同一个inner form实例
+        if self._inner_form is None:
+            self._inner_form = self._get_form()
+            self._inner_form_disabled = self.field.disabled
+        elif self._inner_form_disabled != self.field.disabled:
+            # inner form构建之后field.disabled发生了变化
+            # 只在变化时重新设置一次inner field的disabled
+            base_fields = self.field.form_class.base_fields
+            for name, field in self._inner_form.fields.items():
+                base_field = base_fields.get(name)
+                field.disabled = self.field.disabled or \
+                    (base_field is not None and base_field.disabled)
+            self._inner_form_disabled = self.field.disabled
+        return self._inner_form
+
+    @traced('get_form', _bound_field_tags)
     def _get_form(self, **kwargs):
         # 需要加上is_bound判断
         # 如果不加，inner form会总是bounded
         # 就会影响unbounded情况下initial值的render
         kwargs['initial'] = self.initial
         if self.form.is_bound and 'data' not in kwargs:
-            kwargs['data'] = self.form.data
-        inner_form = self.field.get_form(**kwargs)
-        self._inner_form = inner_form
-        return inner_form
+            kwargs['data'] = self.get_inner_data()
+        if self.nested:
+            kwargs['nested'] = True
+        form = self.field.get_form(**kwargs)
+        form.parent_bound_field = self
+        if self.nested:
+            # 多层嵌套的inner form同样直接使用子dict
+            form.nested = True
+        return form
+
+    def get_inner_data(self):
+        if self.nested:
+            # nested模式下直接把对应的子dict交给inner form，不需要prefix
+            value = self.form.data.get(self.html_name)
+            return value if isinstance(value, Mapping) else {}
+
+        # 只把outer form data中属于inner form prefix的部分交给inner form
+        data_index = getattr(self.form, 'data_index', None)
+        if data_index is None:
+            return self.form.data
+        return data_index.view(self.field.prefix)
+
+    def get_form_for_data(self, data):
+        # outer form在_clean_fields中传入的data就是outer form的data，
+        # 此时inner form已经(或将会)以同样的data构建，直接复用，
+        # 避免再次实例化inner form以及重复full_clean
+        # disabled时传入的是initial，inner form中的field同样是disabled，
+        # 只会使用initial值，因此也可以复用
+        if self.form.is_bound and (data is self.form.data or self.field.disabled):
+            return self.inner_form
+        return self._get_form(data=data)
 
     def value(self):
         return self.inner_form
 
-    @property
+    def is_unchanged(self, form=None):
+        # 只有ModelFormField支持track_changes
+        return False
+
+    def is_absent(self, data=None):
+        """
+        lazy的可选FormField，在outer form的data中没有任何属于它的数据时，
+        不需要构建inner form，也不需要校验和保存
+        """
+        field = self.field
+        form = self.form
+        if not field.lazy or field.required or field.disabled or not form.is_bound:
+            return False
+        if data is not None and data is not form.data:
+            return False
+        if self.nested:
+            return not form.data.get(self.html_name)
+
+        # 嵌套的FormField使用各自的prefix，需要检查整个子树的prefix
+        nested_prefixes = get_nested_data_prefixes(field.form_class)
+        prefix = self.get_data_prefix()
+        if prefix is None or nested_prefixes is None:
+            # 没有prefix时无法区分inner form的数据
+            return False
+        prefixes = (prefix,) + nested_prefixes
+        data_index = getattr(form, 'data_index', None)
+        if data_index is not None:
+            return not any(data_index.has_prefix(prefix) for prefix in prefixes)
+        prefixes = tuple(prefix + '-' for prefix in prefixes)
+        return not any(key.startswith(prefixes) for key in form.data)
+
+    def get_data_prefix(self):
+        return self.field.prefix
+
+    def get_flat_schema(self, data):
+        # outer form设置了flat_validation时，使用编译后的扁平字段表校验整个inner form子树
+        # 不能展开的inner form返回None
+        form = self.form
+        if not getattr(form, 'flat_validation', False) or self.nested or \
+                self.field.disabled or data is not form.data:
+            return None
+        from .schema import get_form_schema
+        return get_form_schema(self.field.get_form_class())
+
+    @cached_property
     def initial(self):
         value = copy.copy(self.field.initial) if self.field.initial is not None else {}
         value.update(self.form.initial.get(self.name, {}))
         return value
 
+    def invalidate(self):
+        # outer form的data或initial被修改之后调用，
+        # 下次访问时重新计算data、initial并重新构建inner form
+        for name in ('data', 'initial'):
+            self.__dict__.pop(name, None)
+        self._inner_form = None
+        self._inner_form_disabled = None
+
+    @traced('render', _bound_field_tags)
     def as_widget(self, widget=None, attrs=None, only_initial=False, using_template=None, template_name=None):
         if using_template is None:
             using_template = self.field.using_template or False
@@ -73,6 +210,40 @@ class BoundFormField(BoundField):
         if template_name is None:
             template_name = self.field.template_name
 
+        render_cache = self.field.get_render_cache()
+        if render_cache is None or self.form.is_bound:
+            return self._as_widget(widget, attrs, only_initial, using_template, template_name)
+
+        key = self.get_render_cache_key(widget, attrs, only_initial, using_template, template_name)
+        if key is None:
+            return self._as_widget(widget, attrs, only_initial, using_template, template_name)
+        html = render_cache.get(key)
+        if html is None:
+            html = self._as_widget(widget, attrs, only_initial, using_template, template_name)
+            render_cache.set(key, str(html))
+        return mark_safe(html)
+
+    def get_render_cache_key(self, widget, attrs, only_initial, using_template, template_name):
+        # 未绑定数据的inner form的渲染结果只由以下参数决定
+        # 返回None表示不能使用缓存
+        field = self.field
+        form_class = field.form_class
+        parts = [
+            '{}.{}'.format(form_class.__module__, form_class.__qualname__),
+            field.prefix, self.nested, self.initial, field.required, field.disabled,
+            list(field.excluded_fields), field.title, field.localize,
+            using_template, template_name, self.html_name, self.auto_id,
+            attrs, only_initial, get_language(),
+            '{}.{}'.format(type(widget).__module__, type(widget).__qualname__) if widget else None,
+        ]
+        try:
+            # initial中无法序列化的值(例如model instance)不能安全地转换为key，不使用缓存
+            value = json.dumps(parts, sort_keys=True, default=_render_cache_key_default)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+    def _as_widget(self, widget=None, attrs=None, only_initial=False, using_template=False, template_name=None):
         # 一下代码段为Django的源码
         if not widget:
             widget = self.field.widget
@@ -124,6 +295,61 @@ class BoundModelFormField(BoundFormField):
         kwargs['instance'] = self.instance
         return super()._get_form(**kwargs)
 
+    def get_render_cache_key(self, *args, **kwargs):
+        # 渲染结果依赖于instance的值，有instance时不使用缓存
+        if self.instance is not None:
+            return None
+        return super().get_render_cache_key(*args, **kwargs)
+
+    def is_unchanged(self, form=None):
+        """
+        track_changes时，已有的inner instance已经关联在outer instance上，
+        并且inner form没有被修改，则不需要校验和保存。
+        需要在save_related建立关联之前调用。
+        """
+        if not self.field.track_changes or not self.form.is_bound:
+            return False
+        if form is None:
+            form = self.inner_form
+        instance = form.instance
+        if instance._state.adding:
+            return False
+        outer_instance = getattr(self.form, 'instance', None)
+        if outer_instance is not None and getattr(outer_instance, self.name, None) is not instance:
+            return False
+        return not form.has_changed()
+
+    def get_update_fields(self):
+        # track_changes时只更新inner form中被修改的字段
+        # 返回None表示更新全部字段
+        form = self.inner_form
+        if not self.field.track_changes or form.instance._state.adding:
+            return None
+        opts = form.instance._meta
+        update_fields = []
+        for name in form.changed_data:
+            try:
+                model_field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.many_to_many and not model_field.primary_key:
+                update_fields.append(model_field.name)
+        # auto_now字段在每次保存时都会更新
+        update_fields.extend(
+            f.name for f in opts.concrete_fields
+            if getattr(f, 'auto_now', False) and f.name not in update_fields
+        )
+        # 关联到outer instance的OneToOneField
+        outer_instance = getattr(self.form, 'instance', None)
+        if outer_instance is not None:
+            try:
+                rel = outer_instance._meta.get_field(self.name)
+            except FieldDoesNotExist:
+                rel = None
+            if rel is not None and rel.one_to_one and rel.auto_created:
+                update_fields.append(rel.field.name)
+        return update_fields
+
     @property
     def instance(self):
         # 在inner_form实例化之前，从outer_form的instance获取instance
@@ -138,29 +364,185 @@ class BoundModelFormField(BoundFormField):
 
         return instance
 
-    def save(self, commit=False):
+    def save(self, commit=False, update_fields=None):
         # 默认情况下commit=False
+        form = self.inner_form
+        if not commit or update_fields is None:
+            return form.save(commit)
+        if func_supports_parameter(form.save, 'update_fields'):
+            return form.save(commit, update_fields=update_fields)
+        instance = form.save(commit=False)
+        instance.save(update_fields=update_fields)
+        form._save_m2m()
+        return instance
+
+
+class BoundFormSetField(BoundFormField):
+
+    def __getitem__(self, index):
+        return self.inner_form[index]
+
+    def __len__(self):
+        return len(self.inner_form)
+
+    @cached_property
+    def data(self):
+        return [
+            {name: form[name].data for name in form.fields}
+            for form in self.inner_form
+        ]
+
+    @property
+    def fields(self):
+        return self.inner_form.form.base_fields
+
+    @cached_property
+    def initial(self):
+        value = self.form.initial.get(self.name, self.field.initial)
+        return list(value) if value else []
+
+    def get_inner_data(self):
+        if not self.nested:
+            return super().get_inner_data()
+
+        # formset通过带序号的key区分各个form，
+        # 需要把list中的每个dict展开，并补上management form的数据
+        items = self.form.data.get(self.html_name)
+        items = [item for item in items if isinstance(item, Mapping)] \
+            if isinstance(items, (list, tuple)) else []
+        prefix = self.get_formset_prefix()
+        data = {
+            '{}-{}'.format(prefix, TOTAL_FORM_COUNT): len(items),
+            '{}-{}'.format(prefix, INITIAL_FORM_COUNT): self.get_initial_form_count(items),
+        }
+        for index, item in enumerate(items):
+            for name, value in item.items():
+                data['{}-{}-{}'.format(prefix, index, name)] = value
+        return data
+
+    def get_formset_prefix(self):
+        return self.field.prefix or self.field.get_form_class().get_default_prefix()
+
+    def get_data_prefix(self):
+        return self.get_formset_prefix()
+
+    def get_initial_form_count(self, items):
+        return min(len(self.initial), len(items))
+
+
+class BoundModelFormSetField(BoundFormSetField):
+
+    def _get_form(self, **kwargs):
+        # inline formset的parent instance即outer form的instance
+        instance = getattr(self.form, 'instance', None)
+        if instance is None:
+            raise ImproperlyConfigured(
+                'ModelFormSetField {} must be used in a ModelForm'.format(self.name)
+            )
+        kwargs['instance'] = instance
+        return super()._get_form(**kwargs)
+
+    def get_render_cache_key(self, *args, **kwargs):
+        # inline formset渲染的是parent instance关联的对象，已保存的parent instance不使用缓存
+        instance = getattr(self.form, 'instance', None)
+        if instance is not None and instance.pk is not None:
+            return None
+        return super().get_render_cache_key(*args, **kwargs)
+
+    def get_formset_prefix(self):
+        parent_model = type(self.form.instance)
+        return self.field.prefix or self.field.get_form_class(parent_model).get_default_prefix()
+
+    def get_initial_form_count(self, items):
+        # 带有主键的item对应已有的对象，需要排在list的前面
+        pk_name = self.field.model._meta.pk.name
+        return sum(1 for _ in itertools.takewhile(lambda item: item.get(pk_name), items))
+
+    def save(self, commit=False):
         return self.inner_form.save(commit)
 
 
+@lru_cache(maxsize=COMPILED_FORM_CLASS_CACHE_SIZE)
+def get_nested_data_prefixes(form_class):
+    """
+    form_class中(多层)嵌套的FormField使用的prefix，
+    存在没有设置prefix的FormField时无法判断，返回None
+    """
+    prefixes = []
+    for field in form_class.base_fields.values():
+        if not isinstance(field, BaseFormField):
+            continue
+        if field.prefix is None:
+            return None
+        nested_prefixes = get_nested_data_prefixes(field.form_class)
+        if nested_prefixes is None:
+            return None
+        prefixes.append(field.prefix)
+        prefixes.extend(nested_prefixes)
+    return tuple(prefixes)
+
+
+def clean_initial(form):
+    # 同Form._clean_fields()，但使用initial作为各field的值
+    cleaned_data = {}
+    for name, field in form.fields.items():
+        initial = form[name].initial
+        if isinstance(field, FileField):
+            cleaned_data[name] = field.clean(initial, initial)
+        else:
+            cleaned_data[name] = field.clean(initial)
+    return cleaned_data
+
+
 class BaseFormField(Field):
     widget = FormInput
     _base_class = None
     _bound_field_class = None
+    # inner form中需要去掉的field，由ModelFormFieldSupportMixin设置
+    excluded_fields = ()
 
     def __init__(self, form_class=None, prefix=None, title=None,
-                 using_template=False, template_name=None, **kwargs):
+                 using_template=False, template_name=None, render_cache=None,
+                 async_validators=(), lazy=False, **kwargs):
         self.title = title
         self.prefix = prefix
         self._form_class = form_class
         self.using_template = using_template
         self.template_name = template_name
+        self.render_cache = render_cache
+        # 接收cleaned value的coroutine function，由async_full_clean()并发执行
+        self.async_validators = list(async_validators)
+        # 为True并且required=False时，没有提交数据的FormField不会构建inner form
+        self.lazy = lazy
         self._bound_field = None
         super().__init__(**kwargs)
 
         if self.initial is None:
             self.initial = {}
 
+    def __deepcopy__(self, memo):
+        # 每个form实例都会deepcopy base_fields
+        # 配置(form_class、initial、title等)在各个实例之间共享，
+        # 只复制widget、validators以及绑定状态
+        cls = self.__class__
+        result = cls.__new__(cls)
+        result.__dict__.update(self.__dict__)
+        memo[id(self)] = result
+
+        widget = self.widget
+        if type(widget).__deepcopy__ is Widget.__deepcopy__:
+            new_widget = type(widget).__new__(type(widget))
+            new_widget.__dict__.update(widget.__dict__)
+            new_widget.attrs = widget.attrs.copy()
+            memo[id(widget)] = new_widget
+            result.widget = new_widget
+        else:
+            result.widget = copy.deepcopy(widget, memo)
+        result.validators = self.validators[:]
+        result.async_validators = self.async_validators[:]
+        result._bound_field = None
+        return result
+
     @cached_property
     def form_class(self):
         form_class = self._form_class
@@ -175,19 +557,21 @@ class BaseFormField(Field):
 
         raise ImproperlyConfigured('form class configured improperly for {}'.format(self.__class__.__name__))
 
-    def get_form(self, **kwargs):
-        kwargs['prefix'] = self.prefix
-
-        form = self.form_class(**kwargs)
-        if not self.required:
-            for field in form.fields.values():
-                field.required = False
+    def get_form_class(self, nested=False):
+        # nested模式下inner form的data就是子dict，不使用prefix
+        prefix = None if nested else self.prefix
+        return get_compiled_form_class(
+            self.form_class, self.required, self.disabled, prefix, self.excluded_fields
+        )
 
-        if self.disabled:
-            for field in form.fields.values():
-                field.disabled = True
+    def get_form(self, nested=False, **kwargs):
+        return self.get_form_class(nested)(**kwargs)
 
-        return form
+    def get_render_cache(self):
+        # render_cache为True时使用默认的进程内LRU缓存
+        if self.render_cache is True:
+            return default_render_cache
+        return self.render_cache or None
 
     def bind(self, form, field_name):
         self._bound_field = self._bound_field_class(form, self, field_name)
@@ -201,18 +585,38 @@ class BaseFormField(Field):
             self._bound_field = self._bound_field_class(form, self, field_name)
         return self._bound_field
 
+    def has_changed(self, initial, data):
+        # Field.has_changed会调用to_python校验inner form，这里直接委托给inner form
+        if self.disabled or self.bound_field.is_absent(data):
+            return False
+        return self.bound_field.get_form_for_data(data).has_changed()
+
+    @traced('to_python', _field_tags)
     def to_python(self, value):
-        form = self.bound_field._get_form(data=value)
+        bound_field = self.bound_field
+        if bound_field.is_absent(value):
+            return {}
+
+        schema = bound_field.get_flat_schema(value)
+        if schema is not None:
+            cleaned_data, errors = schema.clean(value)
+            if errors:
+                raise ValidationError(errors, code='FormFieldError')
+            return cleaned_data
+
+        form = bound_field.get_form_for_data(value)
+        if bound_field.is_unchanged(form):
+            # 未被修改的inner form不需要full_clean，
+            # 只对initial执行各field的clean()，使得cleaned_data的类型与校验之后相同
+            try:
+                return clean_initial(form)
+            except ValidationError:
+                pass
         if form.is_valid():
             return form.cleaned_data
 
         # 将inner_form的errors转化为不带error_dict属性的ValidationError对象
-        new_error_list = []
-        for name, error_list in form.errors.as_data().items():
-            for error in error_list:
-                if hasattr(error, 'message'):
-                    error.message = 'Field {} in FormField: {}'.format(name, error.message)
-            new_error_list.extend(error_list)
+        new_error_list = wrap_form_field_errors(form.errors.as_data().items())
         raise ValidationError(new_error_list, code='FormFieldError')
 
 
@@ -226,10 +630,11 @@ class ModelFormField(BaseFormField):
     _bound_field_class = BoundModelFormField
 
     def __init__(self, form_class=None, model=None, fields=None,
-                 instance=None, **kwargs):
+                 instance=None, track_changes=False, **kwargs):
         self._model = model
         self.fields = fields
         self.instance = instance
+        self.track_changes = track_changes
         super().__init__(form_class, **kwargs)
 
     @cached_property
@@ -248,7 +653,7 @@ class ModelFormField(BaseFormField):
         if not issubclass(self._model, Model):
             raise ImproperlyConfigured('model is not a Model subclass')
         try:
-            form_class = modelform_factory(self._model, fields=self.fields)
+            form_class = get_modelform_class(self._model, self.fields)
         except AttributeError:
             raise ImproperlyConfigured('fields {} are improperly setted.'
                                        .format(self.fields))
@@ -260,16 +665,90 @@ class ModelFormField(BaseFormField):
     def model(self):
         return self.form_class._meta.model
 
+    @property
+    def modelform_declaration(self):
+        # 通过model + fields声明且尚未生成form class时，返回(model, fields)
+        if 'form_class' in self.__dict__ or getattr(self, '_form_class', None) is not None:
+            return None
+        model = getattr(self, '_model', None)
+        if not isinstance(model, type) or not issubclass(model, Model) or \
+                not isinstance(self.fields, list) or self.fields == []:
+            return None
+        return model, tuple(self.fields)
+
+
+class FormSetField(BaseFormField):
+    widget = FormSetInput
+    _base_class = Form
+    _bound_field_class = BoundFormSetField
+    formset = BaseFormSet
+
+    def __init__(self, form_class=None, formset=None, extra=1, can_order=False,
+                 can_delete=False, max_num=None, validate_max=False,
+                 min_num=None, validate_min=False, **kwargs):
+        if formset is not None:
+            self.formset = formset
+        self.formset_options = (
+            ('extra', extra), ('can_order', can_order), ('can_delete', can_delete),
+            ('max_num', max_num), ('validate_max', validate_max),
+            ('min_num', min_num), ('validate_min', validate_min),
+        )
+        kwargs.setdefault('initial', [])
+        super().__init__(form_class, **kwargs)
+
+    def get_form_class(self, parent_model=None):
+        # formset中每个form是否必填由formset自身处理(extra form允许为空)
+        # 这里只需要处理disabled
+        form_class = get_compiled_form_class(self.form_class, True, self.disabled, None)
+        return get_formset_class(form_class, self.formset, self.formset_options, parent_model)
+
+    def get_form(self, nested=False, **kwargs):
+        # formset的data总是带prefix的key，nested模式下由BoundFormSetField展开
+        kwargs['prefix'] = self.prefix
+        return self.get_form_class()(**kwargs)
+
+    @traced('to_python', _field_tags)
     def to_python(self, value):
-        form = self.bound_field._get_form(data=value)
-        if form.is_valid():
-            return form.cleaned_data
+        if self.bound_field.is_absent(value):
+            return []
+
+        formset = self.bound_field.get_form_for_data(value)
+        if formset.is_valid():
+            # 忽略被删除的form以及未填写的extra form
+            return [
+                form.cleaned_data for form in formset
+                if form.cleaned_data and
+                not (formset.can_delete and formset._should_delete_form(form))
+            ]
 
-        # 将inner_form的errors转化为不带error_dict属性的ValidationError对象
         new_error_list = []
-        for name, error_list in form.errors.as_data().items():
-            for error in error_list:
-                if hasattr(error, 'message'):
-                    error.message = 'Field {} in FormField: {}'.format(name, error.message)
-            new_error_list.extend(error_list)
-        raise ValidationError(new_error_list, code='FormFieldError')
+        for index, errors in enumerate(formset.errors):
+            new_error_list.extend(wrap_formset_field_errors(index, errors.as_data().items()))
+        new_error_list.extend(formset.non_form_errors().as_data())
+        raise ValidationError(new_error_list, code='FormSetFieldError')
+
+
+class ModelFormSetField(FormSetField, ModelFormField):
+    """
+    reverse ForeignKey(one-to-many)关系的inline formset
+    """
+    _base_class = ModelForm
+    _bound_field_class = BoundModelFormSetField
+    formset = BulkInlineFormSet
+
+    def __init__(self, form_class=None, fk_name=None, **kwargs):
+        self.fk_name = fk_name
+        super().__init__(form_class, **kwargs)
+
+    def get_form_class(self, parent_model=None):
+        form_class = get_compiled_form_class(self.form_class, True, self.disabled, None)
+        return get_formset_class(
+            form_class, self.formset, self.formset_options, parent_model, self.fk_name
+        )
+
+    def get_form(self, nested=False, **kwargs):
+        instance = kwargs.get('instance')
+        if instance is None:
+            raise ImproperlyConfigured('ModelFormSetField requires the parent instance')
+        kwargs['prefix'] = self.prefix
+        return self.get_form_class(type(instance))(**kwargs)
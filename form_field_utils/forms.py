@@ -1,15 +1,36 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import copy
+import threading
 from collections import OrderedDict
 
 from django.forms.forms import DeclarativeFieldsMetaclass
 from django.forms.models import ModelFormMetaclass
-from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
-from django.db import transaction
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
+from django.db import close_old_connections, transaction
 from django.forms.utils import ErrorList
+from django.utils.functional import cached_property
 
-from .fields import BaseFormField, FormField, ModelFormField
+from .cache import warm_modelform_cache
+from .data import get_data_index
+from .errors import NestedErrorDict, wrap_form_field_errors
+from .fields import BaseFormField, FormField, ModelFormField, ModelFormSetField
+from .tracing import traced, get_form_path, get_form_class
+
+
+def _form_tags(form, *args, **kwargs):
+    return get_form_path(form), get_form_class(form)
+
+
+def _iter_async_validators(path, field, value):
+    # 根据cleaned value向下查找嵌套FormField的async_validators，不需要实例化inner form
+    for validator in field.async_validators:
+        yield path, validator, value
+    if isinstance(value, dict):
+        for name, inner_field in field.get_form_class().base_fields.items():
+            if isinstance(inner_field, BaseFormField) and name in value:
+                yield from _iter_async_validators(path + (name,), inner_field, value[name])
 
 
 class FormFieldSupportFormMeta(DeclarativeFieldsMetaclass):
@@ -23,17 +44,93 @@ class FormFieldSupportFormMeta(DeclarativeFieldsMetaclass):
 
         new_class.form_fields = OrderedDict(form_fields)
 
+        # 预先生成通过model + fields声明的ModelFormField的form class
+        warm_modelform_cache(
+            (field.modelform_declaration for name, field in form_fields
+             if isinstance(field, ModelFormField) and field.modelform_declaration),
+            fail_silently=True
+        )
+
         return new_class
 
 
 class FormFieldSupportMixin(metaclass=FormFieldSupportFormMeta):
-    def __init__(self, *args, **kwargs):
+    # 为True时data是嵌套的dict(例如JSON)，
+    # 每个FormField直接使用data中对应的子dict，FormSetField对应dict的list
+    nested = False
+    # 为True时FormField使用编译后的扁平字段表校验，不再逐层实例化inner form
+    flat_validation = False
+
+    def __init__(self, *args, nested=None, **kwargs):
         super().__init__(*args, **kwargs)
+        if nested is not None:
+            self.nested = nested
 
         for name in self.form_fields:
             # 绑定BoundFormField实例到fields[xxx]
             self.fields[name].bind(self, name)
 
+    @cached_property
+    def data_index(self):
+        # 每个请求只建立一次索引，嵌套的inner form共用最外层form的索引
+        # 不能根据self.data判断：没有任何键的视图会被Form.__init__替换为新的{}
+        parent_bound_field = getattr(self, 'parent_bound_field', None)
+        if parent_bound_field is not None and parent_bound_field.form.is_bound:
+            return parent_bound_field.form.data_index
+        return get_data_index(self.data)
+
+    def invalidate_form_fields(self):
+        # 修改data或initial之后，使各FormField重新计算
+        self.__dict__.pop('data_index', None)
+        for name in self.form_fields:
+            self[name].invalidate()
+
+    async def async_full_clean(self):
+        """
+        同步完成full_clean之后，并发执行各层FormField的async_validators
+        """
+        self.full_clean()
+        cleaned_data = getattr(self, 'cleaned_data', {})
+        checks = []
+        for name in self.form_fields:
+            if name in cleaned_data:
+                checks.extend(_iter_async_validators((name,), self.fields[name], cleaned_data[name]))
+        if not checks:
+            return
+
+        results = await asyncio.gather(
+            *(validator(value) for path, validator, value in checks), return_exceptions=True
+        )
+        for (path, validator, value), result in zip(checks, results):
+            if isinstance(result, ValidationError):
+                self.add_nested_error(path, result)
+            elif isinstance(result, BaseException):
+                raise result
+
+    async def ais_valid(self):
+        await self.async_full_clean()
+        return self.is_bound and not self.errors
+
+    def add_nested_error(self, path, error):
+        # 嵌套FormField的错误同样包装为NestedValidationError，添加到最外层的FormField上
+        if hasattr(error, 'error_dict'):
+            # dict形式的错误以inner form的field name作为下一层
+            error_list = wrap_form_field_errors(error.error_dict.items())
+        else:
+            error_list = error.error_list
+        for index in range(len(path) - 1, 0, -1):
+            error_list = wrap_form_field_errors([(path[index], error_list)])
+        self.add_error(path[0], ValidationError(error_list))
+
+    def get_nested_errors(self):
+        # 按照FormField的嵌套结构组织的errors，可以通过as_json()序列化
+        return NestedErrorDict(self.errors)
+
+    def iter_as_table(self):
+        # 以生成器的方式渲染，可用于StreamingHttpResponse
+        from .renderers import iter_as_table
+        return iter_as_table(self)
+
 
 class ModelFormFieldSupportModelFormMeta(FormFieldSupportFormMeta, ModelFormMetaclass):
     def __new__(mcls, name, bases, attrs):
@@ -44,19 +141,26 @@ class ModelFormFieldSupportModelFormMeta(FormFieldSupportFormMeta, ModelFormMeta
             return new_class
 
         modelform_fields = []
+        modelformset_fields = []
         for fname, field in new_class.form_fields.items():
             # 搜索OneToOneRel对应的ModelFormField
+            # 以及ManyToOneRel对应的ModelFormSetField
             try:
                 model_field = model._meta.get_field(fname)
             except FieldDoesNotExist:
                 continue
-            if model_field.one_to_one and not model_field.concrete and\
-                    isinstance(field, ModelFormField):
+            if model_field.concrete:
+                continue
+            if model_field.one_to_many and isinstance(field, ModelFormSetField):
+                modelformset_fields.append((fname, field))
+            elif model_field.one_to_one and isinstance(field, ModelFormField) and \
+                    not isinstance(field, ModelFormSetField):
                 # if model_field.related_model is not field.model:
                 #     raise ImproperlyConfigured('model not match for field {}.{}'
                 #                                .format(name, fname))
                 modelform_fields.append((fname, field))
         new_class.modelform_fields = OrderedDict(modelform_fields)
+        new_class.modelformset_fields = OrderedDict(modelformset_fields)
 
         return new_class
 
@@ -65,41 +169,126 @@ class ModelFormFieldSupportMixin(FormFieldSupportMixin,
                                  metaclass=ModelFormFieldSupportModelFormMeta):
 
     def __init__(self, *args, **kwargs):
+        self.prepare_modelform_fields()
         super().__init__(*args, **kwargs)
-        outer_model = self._meta.model
+        for name, excluded_fields in self._modelform_field_excludes.items():
+            self.fields[name].excluded_fields = excluded_fields
+
+    @classmethod
+    def prepare_modelform_fields(cls):
+        # 对于同一个class结果都相同，因此每个class只执行一次
+        # form_class可能是尚未定义的import path，所以在第一次实例化时才执行
+        if cls.__dict__.get('_modelform_fields_prepared', False):
+            return
+
+        outer_model = cls._meta.model
         outer_opts = outer_model._meta
-        for name in self.modelform_fields:
-            inner_opts = self.fields[name].model._meta
+        for name, field in cls.modelformset_fields.items():
+            if outer_opts.get_field(name).related_model is not field.model:
+                raise ImproperlyConfigured(
+                    'model: {} not match for field {}.{}'.format(
+                        field.model.__name__,
+                        cls.__name__,
+                        name
+                    )
+                )
+
+        excludes = OrderedDict()
+        for name, field in cls.modelform_fields.items():
+            inner_opts = field.model._meta
 
             # 用于判断inner ModelForm的model是否outer model相匹配
             if outer_opts.get_field(name).related_model is not inner_opts.model:
                 raise ImproperlyConfigured(
                     'model: {} not match for field {}.{}'.format(
                         inner_opts.model.__name__,
-                        self.__class__.__name__,
+                        cls.__name__,
                         name
                     )
                 )
 
             # 用于删除inner form指向outer model的field
-            for inner_field_name in list(self[name].inner_form.fields):
-                if inner_opts.get_field(inner_field_name).related_model is outer_model:
-                    self[name].inner_form.fields.pop(inner_field_name)
+            excluded_fields = []
+            for inner_field_name in field.form_class.base_fields:
+                try:
+                    inner_model_field = inner_opts.get_field(inner_field_name)
+                except FieldDoesNotExist:
+                    continue
+                if inner_model_field.related_model is outer_model:
+                    excluded_fields.append(inner_field_name)
+            excludes[name] = tuple(excluded_fields)
 
-    @transaction.atomic
-    def save(self, commit=True):
+        cls._modelform_field_excludes = excludes
+        cls._modelform_fields_prepared = True
 
-        outer_obj = super().save(commit=commit)
+    @classmethod
+    def get_select_related(cls):
+        # 根据modelform_fields(包括嵌套的ModelFormField)生成select_related的路径
+        paths = []
+        for name, field in cls.modelform_fields.items():
+            paths.append(name)
+            get_select_related = getattr(field.form_class, 'get_select_related', None)
+            if get_select_related is not None:
+                paths.extend('{}__{}'.format(name, path) for path in get_select_related())
+        return paths
+
+    @classmethod
+    def get_queryset(cls, queryset=None):
+        # 通过select_related一次性取出各ModelFormField对应的instance
+        # 使得BoundModelFormField.instance不再触发额外的查询
+        if queryset is None:
+            queryset = cls._meta.model._default_manager.all()
+        return queryset.select_related(*cls.get_select_related())
+
+    @transaction.atomic
+    def save(self, commit=True, update_fields=None):
+        if update_fields is None:
+            outer_obj = super().save(commit=commit)
+        else:
+            # 只更新update_fields中的字段
+            outer_obj = super().save(commit=False)
+            if commit:
+                outer_obj.save(update_fields=update_fields)
+                self._save_m2m()
         self.before_save_related()
         self.save_related(commit=commit)
 
         return outer_obj
 
+    def get_save_plan(self, batch_size=None):
+        # 规划整个ModelFormField树的保存，execute()在一个transaction中按照model批量写入
+        from .bulk import SavePlan
+        return SavePlan([self], batch_size)
+
+    async def asave(self, commit=True, update_fields=None, executor=None):
+        # Django 1.11没有async ORM，transaction也不能跨越await，
+        # 因此在executor的同一个线程中完成整个save()(包括save_related)
+        thread_id = threading.get_ident()
+
+        def save():
+            try:
+                return self.save(commit=commit, update_fields=update_fields)
+            finally:
+                # executor线程中打开的数据库连接按照CONN_MAX_AGE关闭
+                if threading.get_ident() != thread_id:
+                    close_old_connections()
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, save)
+
+    @traced('save_related', _form_tags)
     def save_related(self, commit=True):
         # 建立inner instance和outer instance的关系
         for name in self.modelform_fields:
-            setattr(self.instance, name, self[name].inner_form.instance)
-            self[name].save(commit=commit)
+            bound_field = self[name]
+            if bound_field.is_absent() or bound_field.is_unchanged():
+                continue
+            update_fields = bound_field.get_update_fields()
+            setattr(self.instance, name, bound_field.inner_form.instance)
+            bound_field.save(commit=commit, update_fields=update_fields)
+        for name in self.modelformset_fields:
+            if not self[name].is_absent():
+                self[name].save(commit=commit)
 
     def before_save_related(self):
         pass
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+FormSetField使用的formset
+"""
+
+from django.forms.models import BaseInlineFormSet
+
+from .bulk import SavePlan
+
+
+class BulkInlineFormSet(BaseInlineFormSet):
+    """
+    使用bulk_create/bulk_update保存新增和修改的对象，
+    并通过一条DELETE删除被标记删除的对象，而不是逐行save()/delete()。
+    """
+    batch_size = None
+
+    def get_bulk_save_forms(self):
+        # 返回需要保存的form列表以及需要删除的对象列表
+        # 新增对象的外键在这里指向最新的outer instance
+        self.changed_objects = []
+        self.deleted_objects = []
+        self.new_objects = []
+
+        save_forms = []
+        forms_to_delete = self.deleted_forms
+        for form in self.initial_forms:
+            obj = form.instance
+            if obj.pk is None:
+                continue
+            if form in forms_to_delete:
+                self.deleted_objects.append(obj)
+            elif form.has_changed():
+                self.changed_objects.append((obj, form.changed_data))
+                save_forms.append(form)
+
+        for form in self.extra_forms:
+            if not form.has_changed():
+                continue
+            if self.can_delete and self._should_delete_form(form):
+                continue
+            setattr(form.instance, self.fk.name, self.instance)
+            self.new_objects.append(form.instance)
+            save_forms.append(form)
+
+        return save_forms, self.deleted_objects
+
+    def save(self, commit=True):
+        if not commit:
+            return super().save(commit=False)
+
+        save_forms, deleted_objects = self.get_bulk_save_forms()
+        # 删除和写入由SavePlan在同一个transaction中执行，写入失败时删除也会回滚
+        plan = SavePlan(save_forms, batch_size=self.batch_size)
+        plan.deletes.setdefault(self.model, []).extend(deleted_objects)
+        return plan.execute()
+
+    save.alters_data = True
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+使用ModelFormFieldSupportMixin表单批量导入记录
+
+    importer = FormImporter(OrderModelForm, chunk_size=500, nested=True)
+    for result in importer.iter_results(records):
+        if result.errors:
+            log.warning('row %s: %s', result.index, result.errors.as_json())
+
+records可以是任意的iterable(例如逐行读取的CSV/JSONL)，每条记录实例化一个form并校验，
+通过校验的form每chunk_size条使用bulk_save()保存一次，每个chunk一个transaction，
+任何时候最多只保留一个chunk的form。
+"""
+
+from collections import namedtuple
+
+from .bulk import bulk_save
+from .errors import NestedErrorDict
+
+
+ImportResult = namedtuple('ImportResult', ['index', 'record', 'instance', 'errors'])
+
+
+class FormImporter(object):
+    """
+    iter_results()按照处理的顺序产生ImportResult：
+    未通过校验的记录立即产生(instance为None)，
+    通过校验的记录在所在的chunk保存之后产生(errors为None)，
+    因此结果的顺序与records的顺序不一定相同，需要使用index对应。
+    """
+
+    def __init__(self, form_class, chunk_size=100, batch_size=None, nested=False, form_kwargs=None):
+        self.form_class = form_class
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.nested = nested
+        self.form_kwargs = form_kwargs or {}
+
+    def get_form(self, record):
+        kwargs = dict(self.form_kwargs)
+        if self.nested:
+            kwargs['nested'] = True
+        return self.form_class(record, **kwargs)
+
+    def iter_results(self, records):
+        chunk = []
+        for index, record in enumerate(records):
+            form = self.get_form(record)
+            if not form.is_valid():
+                yield ImportResult(index, record, None, NestedErrorDict(form.errors))
+                continue
+            chunk.append((index, record, form))
+            if len(chunk) >= self.chunk_size:
+                yield from self.save_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self.save_chunk(chunk)
+
+    def save_chunk(self, chunk):
+        # bulk_save在一个transaction中保存整个chunk，
+        # 数据库错误会回滚整个chunk并向上抛出
+        instances = bulk_save([form for index, record, form in chunk], batch_size=self.batch_size)
+        for (index, record, form), instance in zip(chunk, instances):
+            yield ImportResult(index, record, instance, None)
+
+
+def import_records(form_class, records, **kwargs):
+    return FormImporter(form_class, **kwargs).iter_results(records)
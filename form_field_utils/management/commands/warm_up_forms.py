@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = 'Resolve and precompile the nested form classes of FormFieldSupportMixin forms.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'form_paths', nargs='*', metavar='form_path',
+            help='Import paths of the forms to warm up, defaults to all FormFieldSupportMixin subclasses.'
+        )
+        parser.add_argument(
+            '--no-autodiscover', action='store_false', dest='autodiscover',
+            help='Do not import the forms module of each installed app.'
+        )
+
+    def handle(self, *form_paths, **options):
+        form_paths = options['form_paths'] or None
+        results = warm_up(form_paths, autodiscover=options['autodiscover'])
+
+        errors = 0
+        for result in results:
+            if result.error is None:
+                self.stdout.write('{:>10.2f}ms  {}'.format(result.duration * 1000, result.path))
+            else:
+                errors += 1
+                self.stderr.write('{:>10}    {}: {}'.format('ERROR', result.path, result.error))
+
+        total = sum(result.duration for result in results)
+        self.stdout.write('Warmed up {} form classes in {:.2f}ms.'.format(len(results), total * 1000))
+        if errors:
+            raise CommandError('{} form classes are improperly configured.'.format(errors))
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+使用进程池并行校验大量的嵌套数据
+
+    validator = ParallelValidator(OrderForm, processes=4, chunk_size=200)
+    for result in validator.validate(payloads):
+        if not result.is_valid:
+            print(result.errors)
+
+form class以import path的形式传给worker，每个worker只在初始化时配置一次Django
+并预先准备form class(ModelFormField检查、form class解析等)。
+payloads按照chunk_size分组分发，结果(cleaned_data或者errors的JSON数据)按照输入的顺序返回。
+"""
+
+import multiprocessing
+from collections import namedtuple
+from itertools import chain, islice
+
+import django
+from django.apps import apps
+from django.db import connections
+from django.db.transaction import TransactionManagementError
+from django.utils.module_loading import import_string
+
+from .errors import NestedErrorDict
+
+
+ValidationResult = namedtuple('ValidationResult', ['is_valid', 'cleaned_data', 'errors'])
+
+# worker进程中已经准备好的form class
+_form_classes = {}
+
+
+def get_form_path(form_class):
+    if isinstance(form_class, str):
+        return form_class
+    return '{}.{}'.format(form_class.__module__, form_class.__qualname__)
+
+
+def prepare_form_class(form_class):
+    # 解析通过import path声明的(嵌套的)form class并生成编译后的class
+    from .warmup import warm_up_form_class
+    warm_up_form_class(form_class)
+
+
+def get_form_class(form_path):
+    form_class = _form_classes.get(form_path)
+    if form_class is None:
+        form_class = _form_classes[form_path] = import_string(form_path)
+        prepare_form_class(form_class)
+    return form_class
+
+
+def validate_payload(form_class, payload, nested=False, form_kwargs=None):
+    kwargs = dict(form_kwargs or {})
+    if nested:
+        kwargs['nested'] = True
+    form = form_class(payload, **kwargs)
+    if form.is_valid():
+        return ValidationResult(True, form.cleaned_data, None)
+    return ValidationResult(False, None, NestedErrorDict(form.errors).get_json_data())
+
+
+def _init_worker(form_path):
+    # 使用spawn启动的worker需要重新配置Django
+    if not apps.ready:
+        django.setup()
+    get_form_class(form_path)
+
+
+def _validate_chunk(task):
+    form_path, nested, form_kwargs, payloads = task
+    form_class = get_form_class(form_path)
+    return [validate_payload(form_class, payload, nested, form_kwargs) for payload in payloads]
+
+
+class ParallelValidator(object):
+    """
+    processes为0时在当前进程中校验，便于调试
+    start_method为'spawn'或'forkserver'时worker不继承当前进程的数据库连接，
+    可以在transaction中使用
+    """
+
+    def __init__(self, form_class, processes=None, chunk_size=100, nested=False,
+                 form_kwargs=None, start_method=None):
+        self.form_path = get_form_path(form_class)
+        self.processes = processes
+        self.start_method = start_method
+        self.chunk_size = chunk_size
+        self.nested = nested
+        self.form_kwargs = form_kwargs
+
+    def iter_tasks(self, payloads):
+        payloads = iter(payloads)
+        while True:
+            chunk = list(islice(payloads, self.chunk_size))
+            if not chunk:
+                return
+            yield self.form_path, self.nested, self.form_kwargs, chunk
+
+    def validate(self, payloads):
+        tasks = self.iter_tasks(payloads)
+        if self.processes == 0:
+            yield from chain.from_iterable(map(_validate_chunk, tasks))
+            return
+
+        context = multiprocessing.get_context(self.start_method)
+        if context.get_start_method() == 'fork':
+            # 不能在fork出的进程中继续使用父进程的数据库连接，
+            # 关闭transaction中的连接会丢失尚未提交的修改
+            if any(conn.in_atomic_block for conn in connections.all()):
+                raise TransactionManagementError(
+                    'ParallelValidator can not fork inside an atomic block, '
+                    "use start_method='spawn' or 'forkserver' instead."
+                )
+            connections.close_all()
+        with context.Pool(self.processes, _init_worker, (self.form_path,)) as pool:
+            yield from chain.from_iterable(pool.imap(_validate_chunk, tasks))
+
+
+def validate_parallel(form_class, payloads, **kwargs):
+    return list(ParallelValidator(form_class, **kwargs).validate(payloads))
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+"""
+以生成器的方式渲染嵌套的FormField
+
+iter_as_table(form)逐行产生HTML片段，遇到BoundFormField时递归渲染inner form，
+拼接后的结果与form.as_table()完全相同，可以直接用于StreamingHttpResponse：
+
+    return StreamingHttpResponse(iter_as_table(form))
+
+render_as_table(form)同样输出与form.as_table()相同的HTML，FormInput默认使用它渲染inner form。
+两者共用按照form的渲染配置只计算一次的label、help text以及css class(CompiledTable)，
+渲染时只需要填入errors以及widget的HTML。
+重写了渲染逻辑而不能编译的form直接使用form.as_table()。
+"""
+
+from django.forms.boundfield import BoundField
+from django.forms.forms import BaseForm, Form
+from django.forms.formsets import BaseFormSet
+from django.utils.encoding import force_text
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language, ugettext as _
+
+from .cache import COMPILED_FORM_CLASS_CACHE_SIZE, LocMemRenderCache
+from .fields import BoundFormField
+
+
+NORMAL_ROW_START = '<tr%s><th>%s</th><td>%s'
+ERROR_ROW = '<tr><td colspan="2">%s</td></tr>'
+ROW_ENDER = '</td></tr>'
+HELP_TEXT_HTML = '<br /><span class="helptext">%s</span>'
+
+
+_missing = object()
+
+# 按照form的渲染配置缓存CompiledTable，无法编译的form保存为False
+_compiled_tables = LocMemRenderCache(maxsize=COMPILED_FORM_CLASS_CACHE_SIZE)
+
+
+def _css_classes(form, field, has_errors):
+    # 同BoundField.css_classes()，包括set中class的顺序
+    extra_classes = set()
+    if has_errors and hasattr(form, 'error_css_class'):
+        extra_classes.add(form.error_css_class)
+    if field.required and hasattr(form, 'required_css_class'):
+        extra_classes.add(form.required_css_class)
+    return ' '.join(extra_classes)
+
+
+def _is_compilable(form, bound_fields):
+    # 重写了渲染逻辑的form以及BoundField只能使用as_table()
+    form_class = type(form)
+    if form_class.as_table is not Form.as_table or \
+            form_class._html_output is not BaseForm._html_output:
+        return False
+    return all(
+        type(bound_field).label_tag is BoundField.label_tag and
+        type(bound_field).css_classes is BoundField.css_classes
+        for bound_field in bound_fields
+    )
+
+
+class CompiledTable(object):
+    """
+    预先生成的form.as_table()各行中与data以及errors无关的部分
+    """
+
+    def __init__(self, form, bound_fields):
+        self.rows = []
+        for bound_field in bound_fields:
+            field = bound_field.field
+            if bound_field.is_hidden:
+                self.rows.append((bound_field.name, True, None, None, None))
+                continue
+
+            class_attrs = tuple(
+                ' class="%s"' % css_classes if css_classes else ''
+                for css_classes in (_css_classes(form, field, False), _css_classes(form, field, True))
+            )
+            if bound_field.label:
+                label = conditional_escape(force_text(bound_field.label))
+                label = force_text(bound_field.label_tag(label) or '')
+            else:
+                label = ''
+            help_text = HELP_TEXT_HTML % force_text(field.help_text) if field.help_text else ''
+            self.rows.append((bound_field.name, False, class_attrs, label, help_text))
+
+    def iter_html(self, form, iter_field):
+        """
+        按照Form._html_output()的逻辑逐行产生HTML，
+        iter_field(bound_field)产生可见field的widget HTML
+        """
+        top_errors = form.non_field_errors()
+        rows, hidden_fields = [], []
+
+        for name, is_hidden, class_attrs, label, help_text in self.rows:
+            bound_field = form[name]
+            errors = form.error_class([conditional_escape(error) for error in bound_field.errors])
+            if is_hidden:
+                if errors:
+                    top_errors.extend(
+                        [_('(Hidden field %(name)s) %(error)s') % {'name': name, 'error': force_text(e)}
+                         for e in errors])
+                hidden_fields.append(bound_field)
+            else:
+                rows.append((bound_field, errors, class_attrs[bool(errors)], label, help_text))
+
+        def get_hidden():
+            return ''.join(force_text(bound_field) for bound_field in hidden_fields)
+
+        if top_errors:
+            error_row = ERROR_ROW % force_text(top_errors)
+            if not rows and hidden_fields:
+                # 没有可见的field时，hidden field插入到错误行中
+                error_row = error_row[:-len(ROW_ENDER)] + get_hidden() + ROW_ENDER
+            yield error_row
+            if rows:
+                yield '\n'
+        elif not rows:
+            if hidden_fields:
+                yield get_hidden()
+            return
+
+        last = len(rows) - 1
+        for i, (bound_field, errors, class_attr, label, help_text) in enumerate(rows):
+            if i:
+                yield '\n'
+            yield NORMAL_ROW_START % (class_attr, label, force_text(errors))
+            yield from iter_field(bound_field)
+            hidden = get_hidden() if i == last else ''
+            yield help_text + hidden + ROW_ENDER
+
+
+def get_table_key(form, bound_fields):
+    # label、help text以及css class依赖的所有配置，
+    # 在__init__中修改了fields的form也会得到不同的key
+    return (
+        type(form), form.prefix, form.auto_id, force_text(form.label_suffix), get_language(),
+        getattr(form, 'error_css_class', _missing), getattr(form, 'required_css_class', _missing),
+        tuple(
+            (bound_field.name, type(bound_field), bound_field.label, bound_field.field.help_text,
+             bound_field.field.label_suffix, bound_field.field.required, bound_field.is_hidden,
+             type(bound_field.field.widget), bound_field.field.widget.attrs.get('id'))
+            for bound_field in bound_fields
+        ),
+    )
+
+
+def get_compiled_table(form):
+    """
+    返回form对应的CompiledTable，不能编译时返回None
+    """
+    bound_fields = [form[name] for name in form.fields]
+    key = get_table_key(form, bound_fields)
+    table = _compiled_tables.get(key)
+    if table is None:
+        table = CompiledTable(form, bound_fields) if _is_compilable(form, bound_fields) else False
+        _compiled_tables.set(key, table)
+    return table or None
+
+
+def clear_compiled_tables():
+    _compiled_tables.clear()
+
+
+def _is_streamable(bound_field):
+    # 使用template渲染的FormField只能整体渲染
+    return isinstance(bound_field, BoundFormField) and \
+        not bound_field.field.using_template and \
+        not bound_field.field.show_hidden_initial
+
+
+def _iter_field(bound_field):
+    yield force_text(bound_field)
+
+
+def _iter_streamed_field(bound_field):
+    if _is_streamable(bound_field):
+        yield from iter_inner_form(bound_field.inner_form)
+    else:
+        yield force_text(bound_field)
+
+
+def iter_inner_form(inner_form):
+    if isinstance(inner_form, BaseFormSet):
+        # 同BaseFormSet.as_table()
+        yield force_text(inner_form.management_form)
+        yield '\n'
+        for i, form in enumerate(inner_form):
+            if i:
+                yield ' '
+            yield from iter_as_table(form)
+    else:
+        yield from iter_as_table(inner_form)
+
+
+def iter_as_table(form):
+    """
+    逐行产生form.as_table()的HTML，遇到FormField时递归产生inner form的各行
+    """
+    table = get_compiled_table(form)
+    if table is None:
+        yield force_text(form.as_table())
+        return
+    yield from table.iter_html(form, _iter_streamed_field)
+
+
+def render_as_table(form):
+    """
+    输出与form.as_table()相同的HTML，form也可以是formset
+    """
+    if isinstance(form, BaseFormSet):
+        # 同BaseFormSet.as_table()
+        forms = ' '.join(render_as_table(inner_form) for inner_form in form)
+        return mark_safe('\n'.join([str(form.management_form), forms]))
+
+    table = get_compiled_table(form)
+    if table is None:
+        return form.as_table()
+    return mark_safe(''.join(table.iter_html(form, _iter_field)))
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+把嵌套的FormField编译为扁平的字段表
+
+每个(编译后的)inner form class只编译一次，多层嵌套的inner form被展开为一个列表，
+校验时在一个循环中完成，不需要实例化各层inner form，最后再组装成嵌套的cleaned_data。
+错误信息与逐层full_clean得到的结果相同。
+
+只有可以安全展开的form才会被编译，以下情况返回None，使用原有的逐层校验：
+ModelForm、自定义了__init__/clean/clean_<field>等方法的form、
+disabled或FileField的field、FormSetField、lazy的FormField以及自定义了校验逻辑的FormField。
+"""
+
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+from django.forms.fields import Field, FileField
+from django.forms.forms import BaseForm
+from django.forms.models import BaseModelForm
+
+from .cache import COMPILED_FORM_CLASS_CACHE_SIZE
+from .errors import wrap_form_field_errors
+from .fields import BaseFormField
+from .forms import FormFieldSupportMixin
+
+
+FIELD, START, END = 0, 1, 2
+
+_FORM_METHODS = ('full_clean', '_clean_fields', '_clean_form', '_post_clean', 'clean', 'add_prefix')
+
+
+def _is_flat_form_class(form_class):
+    if not isinstance(form_class, type) or not issubclass(form_class, BaseForm) or \
+            issubclass(form_class, BaseModelForm):
+        return False
+    if form_class.__init__ not in (BaseForm.__init__, FormFieldSupportMixin.__init__):
+        return False
+    return all(getattr(form_class, name) is getattr(BaseForm, name) for name in _FORM_METHODS)
+
+
+def _is_flat_form_field(field):
+    field_class = type(field)
+    return field_class.to_python is BaseFormField.to_python and \
+        field_class.clean is Field.clean and \
+        field_class.validate is Field.validate and \
+        not field.validators and not field.disabled and not field.lazy
+
+
+def _compile(form_class, entries):
+    if not _is_flat_form_class(form_class):
+        return False
+    prefix = form_class.prefix
+    for name, field in form_class.base_fields.items():
+        if isinstance(field, BaseFormField):
+            if not _is_flat_form_field(field):
+                return False
+            entries.append((START, name, None, None))
+            if not _compile(field.get_form_class(), entries):
+                return False
+            entries.append((END, name, None, None))
+        elif field.disabled or isinstance(field, FileField) or \
+                hasattr(form_class, 'clean_{}'.format(name)):
+            return False
+        else:
+            # 同Form.add_prefix()
+            html_name = '{}-{}'.format(prefix, name) if prefix else name
+            entries.append((FIELD, name, field, html_name))
+    return True
+
+
+class FormSchema(object):
+    def __init__(self, form_class, entries):
+        self.form_class = form_class
+        self.entries = entries
+
+    def clean(self, data, files=None):
+        """
+        校验整个inner form子树，返回(cleaned_data, errors)
+        errors为ValidationError的list，与inner form逐层校验得到的结果相同
+        """
+        files = files if files is not None else {}
+        cleaned_stack, errors_stack = [{}], [[]]
+        for kind, name, field, html_name in self.entries:
+            if kind == FIELD:
+                value = field.widget.value_from_datadict(data, files, html_name)
+                try:
+                    cleaned_stack[-1][name] = field.clean(value)
+                except ValidationError as e:
+                    errors_stack[-1].append((name, e.error_list))
+            elif kind == START:
+                cleaned_stack.append({})
+                errors_stack.append([])
+            else:
+                cleaned_data, errors = cleaned_stack.pop(), errors_stack.pop()
+                if errors:
+                    errors_stack[-1].append((name, wrap_form_field_errors(errors)))
+                else:
+                    cleaned_stack[-1][name] = cleaned_data
+        return cleaned_stack[0], wrap_form_field_errors(errors_stack[0])
+
+    def __len__(self):
+        return sum(1 for entry in self.entries if entry[0] == FIELD)
+
+
+@lru_cache(maxsize=COMPILED_FORM_CLASS_CACHE_SIZE)
+def get_form_schema(form_class):
+    """
+    form_class为FormField编译后的inner form class，不能展开时返回None
+    """
+    entries = []
+    if not _compile(form_class, entries):
+        return None
+    return FormSchema(form_class, tuple(entries))
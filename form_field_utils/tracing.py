@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+嵌套FormField生命周期的性能追踪
+
+通过set_tracer()设置tracer之后，inner form的构建、校验、渲染
+以及save_related都会以TraceEvent的形式传给tracer：
+
+    def tracer(event):
+        statsd.timing('formfield.' + event.name, event.duration)
+
+    set_tracer(tracer)
+
+未设置tracer时，被追踪的方法只多一次全局变量的判断。
+"""
+
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import wraps
+
+
+TraceEvent = namedtuple('TraceEvent', ['name', 'path', 'depth', 'form_class', 'duration'])
+
+_tracer = None
+
+
+def set_tracer(tracer):
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer():
+    return _tracer
+
+
+@contextmanager
+def use_tracer(tracer):
+    previous = _tracer
+    set_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_tracer(previous)
+
+
+def get_form_path(form):
+    # inner form通过parent_bound_field指向外层的BoundFormField
+    bound_field = getattr(form, 'parent_bound_field', None)
+    if bound_field is None:
+        return ()
+    return bound_field.path
+
+
+def get_form_class(form):
+    # inner form是FormField编译后的form class的实例，返回FormField配置的form class
+    bound_field = getattr(form, 'parent_bound_field', None)
+    if bound_field is None:
+        return type(form)
+    return bound_field.field.form_class
+
+
+def traced(name, get_tags):
+    """
+    追踪被装饰方法的耗时。
+    get_tags(self, *args, **kwargs)返回(path, form_class)，只在设置了tracer时调用。
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(self, *args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                path, form_class = get_tags(self, *args, **kwargs)
+                tracer(TraceEvent(name, path, len(path), form_class, duration))
+        return wrapper
+    return decorator
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+在worker开始处理请求之前预热FormFieldSupportMixin表单
+
+    for result in warm_up():
+        if result.error is not None:
+            log.error('%s: %s', result.path, result.error)
+
+FormField通过import path或者model + fields声明的form class在第一次使用时才会解析，
+warm_up()预先完成这些工作：解析(嵌套的)form class、检查ModelFormField的配置、
+生成编译后的form class/formset class以及扁平校验的字段表，
+配置错误在这里就会以ImproperlyConfigured等异常的形式报告出来。
+"""
+
+import copy
+import time
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, FieldError, ImproperlyConfigured
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from .fields import FormSetField, ModelFormSetField
+from .forms import FormFieldSupportMixin, ModelFormFieldSupportMixin
+from .parallel import get_form_path
+from .schema import get_form_schema
+
+
+WarmUpResult = namedtuple('WarmUpResult', ['path', 'form_class', 'duration', 'error'])
+
+WARM_UP_ERRORS = (ImproperlyConfigured, FieldError, FieldDoesNotExist, ImportError)
+
+
+def iter_form_classes(autodiscover=True):
+    """
+    按照定义的顺序产生所有FormFieldSupportMixin的子类，
+    autodiscover为True时先导入各个app的forms模块
+    """
+    if autodiscover:
+        autodiscover_modules('forms')
+
+    seen = set()
+    stack = list(reversed(FormFieldSupportMixin.__subclasses__()))
+    while stack:
+        form_class = stack.pop()
+        if form_class in seen:
+            continue
+        seen.add(form_class)
+        stack.extend(reversed(form_class.__subclasses__()))
+        # 跳过mixin本身以及没有设置Meta.model的ModelForm基类
+        if form_class is ModelFormFieldSupportMixin:
+            continue
+        if issubclass(form_class, ModelFormFieldSupportMixin) and form_class._meta.model is None:
+            continue
+        # 跳过get_compiled_form_class()生成的子类(与原class同名)
+        path = get_form_path(form_class)
+        if any(get_form_path(base) == path for base in form_class.__bases__):
+            continue
+        yield form_class
+
+
+def warm_up_form_class(form_class, _seen=None):
+    """
+    预先解析form_class中所有(嵌套的)FormField的form class并生成编译后的class
+    """
+    seen = set() if _seen is None else _seen
+    if form_class in seen:
+        return
+    seen.add(form_class)
+
+    prepare_modelform_fields = getattr(form_class, 'prepare_modelform_fields', None)
+    if prepare_modelform_fields is not None:
+        prepare_modelform_fields()
+
+    meta = getattr(form_class, '_meta', None)
+    parent_model = getattr(meta, 'model', None)
+    flat_validation = getattr(form_class, 'flat_validation', False)
+    excludes = getattr(form_class, '_modelform_field_excludes', {})
+    for name, field in getattr(form_class, 'form_fields', {}).items():
+        if excludes.get(name):
+            # 与ModelFormFieldSupportMixin.__init__中设置的excluded_fields保持一致
+            field = copy.copy(field)
+            field.excluded_fields = excludes[name]
+        inner_form_class = field.form_class
+        # 先预热inner form class，编译后的class复制base_fields时会带上已经解析的form class
+        if issubclass(inner_form_class, FormFieldSupportMixin):
+            warm_up_form_class(inner_form_class, seen)
+
+        if isinstance(field, ModelFormSetField):
+            if parent_model is not None:
+                field.get_form_class(parent_model)
+        elif isinstance(field, FormSetField):
+            field.get_form_class()
+        else:
+            compiled_class = field.get_form_class()
+            if flat_validation:
+                get_form_schema(compiled_class)
+
+
+def warm_up(form_classes=None, autodiscover=True):
+    """
+    预热form_classes(form class或者import path)，为None时预热所有FormFieldSupportMixin的子类，
+    返回每个class的WarmUpResult，配置错误记录在error中而不会抛出
+    """
+    if form_classes is None:
+        form_classes = iter_form_classes(autodiscover)
+
+    results = []
+    for form_class in form_classes:
+        path = get_form_path(form_class)
+        start = time.perf_counter()
+        error = None
+        try:
+            if isinstance(form_class, str):
+                form_class = None
+                form_class = import_string(path)
+            warm_up_form_class(form_class)
+        except WARM_UP_ERRORS as e:
+            error = e
+        results.append(WarmUpResult(path, form_class, time.perf_counter() - start, error))
+    return results
@@ -2,13 +2,22 @@
 
 from django.forms.widgets import Widget
 
+from .tracing import traced, get_form_path, get_form_class
+
+
+def _widget_tags(widget, name, value, *args, **kwargs):
+    return get_form_path(value), get_form_class(value)
+
 
 class FormInput(Widget):
     template_name = 'form_field_utils/form_input.html'
 
+    @traced('widget_render', _widget_tags)
     def render(self, name, value, attrs=None, renderer=None, context=None, using_template=None, template_name=None):
         if not using_template:
-            return value.as_table()
+            # 与value.as_table()的输出相同，label等只在每个form class第一次渲染时计算
+            from .renderers import render_as_table
+            return render_as_table(value)
 
         template_name = template_name or self.template_name
         context = self.get_context(name, value, attrs, context, template_name)
@@ -23,3 +32,12 @@ class FormInput(Widget):
         ctx['form'] = value
         context.update(ctx)
         return context
+
+
+class FormSetInput(FormInput):
+    template_name = 'form_field_utils/formset_input.html'
+
+    def get_context(self, name, value, attrs, context=None, template_name=None):
+        context = super().get_context(name, value, attrs, context, template_name)
+        context['formset'] = value
+        return context
@@ -2,10 +2,10 @@
 
 from django import forms
 
-from form_field_utils.fields import FormField, ModelFormField
+from form_field_utils.fields import FormField, ModelFormField, FormSetField, ModelFormSetField
 from form_field_utils.forms import FormFieldSupportMixin, ModelFormFieldSupportMixin
 
-from .models import TestModel, Case, Application
+from .models import TestModel, Case, Application, Attachment
 
 
 class InnerForm(forms.Form):
@@ -68,3 +68,30 @@ class TestCaseModelForm(ModelFormFieldSupportMixin, forms.ModelForm):
     class Meta:
         model = Case
         fields = '__all__'
+
+
+class ItemForm(forms.Form):
+    name = forms.CharField()
+    quantity = forms.IntegerField()
+
+
+class OuterFormWithFormSet(FormFieldSupportMixin, forms.Form):
+    other_field = forms.CharField()
+    items = FormSetField(ItemForm, prefix='items', extra=1, can_delete=True)
+
+
+class AttachmentModelForm(forms.ModelForm):
+    class Meta:
+        model = Attachment
+        fields = ['name']
+
+
+class CaseWithAttachmentsModelForm(ModelFormFieldSupportMixin, forms.ModelForm):
+    application = ModelFormField(ApplicationModelForm)
+    attachments = ModelFormSetField(
+        AttachmentModelForm, prefix='attachments', extra=2, can_delete=True, required=False
+    )
+
+    class Meta:
+        model = Case
+        fields = '__all__'
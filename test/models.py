@@ -15,3 +15,8 @@ class Case(models.Model):
 class Application(models.Model):
     no = models.CharField(max_length=255)
     case = models.OneToOneField(Case, null=True, blank=True)
+
+
+class Attachment(models.Model):
+    name = models.CharField(max_length=255)
+    case = models.ForeignKey(Case, related_name='attachments', on_delete=models.CASCADE)
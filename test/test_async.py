@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django import forms as django_forms
+from django.core.exceptions import ValidationError
+from django.test import TestCase, TransactionTestCase
+
+from form_field_utils.fields import FormField
+from form_field_utils.forms import FormFieldSupportMixin
+
+from . import forms
+from .models import Case, Application
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class Validator(object):
+    def __init__(self, invalid=None):
+        self.invalid = invalid
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, value):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if value.get('inner_field') == self.invalid:
+            raise ValidationError('Invalid remote value', code='remote')
+        if value.get('inner_field') == self.invalid + '_dict':
+            raise ValidationError({'inner_field': ValidationError('Invalid remote value', code='remote')})
+
+
+class AsyncFullCleanTestCase(TestCase):
+
+    def setUp(self):
+        self.validator = validator = Validator(invalid='invalid')
+
+        class MiddleForm(FormFieldSupportMixin, django_forms.Form):
+            form_field = FormField(forms.InnerForm, prefix='middle-inner', async_validators=[validator])
+
+        class AsyncOuterForm(FormFieldSupportMixin, django_forms.Form):
+            form_field_0 = FormField(forms.InnerForm, prefix='f0', async_validators=[validator])
+            form_field_1 = FormField(forms.InnerForm, prefix='f1', async_validators=[validator])
+            middle = FormField(MiddleForm, prefix='middle')
+
+        self.form_class = AsyncOuterForm
+
+    def get_data(self, **kwargs):
+        data = {}
+        for prefix in ('f0', 'f1', 'middle-inner'):
+            data.update({
+                '{}-inner_field'.format(prefix): 'val',
+                '{}-inner_field_with_inner_form_initial'.format(prefix): 'val',
+                '{}-inner_field_with_outer_form_initial'.format(prefix): 'val',
+            })
+        data.update(kwargs)
+        return data
+
+    def test_valid(self):
+        outer_form = self.form_class(self.get_data())
+        self.assertTrue(run(outer_form.ais_valid()), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['middle']['form_field']['inner_field'], 'val')
+
+    def test_validators_run_concurrently(self):
+        outer_form = self.form_class(self.get_data())
+        run(outer_form.async_full_clean())
+        self.assertEqual(self.validator.max_running, 3)
+
+    def test_async_errors(self):
+        outer_form = self.form_class(self.get_data(**{
+            'f1-inner_field': 'invalid', 'middle-inner-inner_field': 'invalid'
+        }))
+        self.assertFalse(run(outer_form.ais_valid()))
+        self.assertEqual(outer_form.errors['form_field_1'], ['Invalid remote value'])
+        self.assertNotIn('form_field_1', outer_form.cleaned_data)
+        self.assertEqual(
+            outer_form.errors['middle'], ['Field form_field in FormField: Invalid remote value']
+        )
+        self.assertEqual(
+            outer_form.get_nested_errors().get_json_data()['middle'],
+            {'form_field': [{'message': 'Invalid remote value', 'code': 'remote'}]}
+        )
+
+    def test_async_dict_errors(self):
+        outer_form = self.form_class(self.get_data(**{
+            'f1-inner_field': 'invalid_dict', 'middle-inner-inner_field': 'invalid_dict'
+        }))
+        self.assertFalse(run(outer_form.ais_valid()))
+        self.assertEqual(
+            outer_form.errors['form_field_1'], ['Field inner_field in FormField: Invalid remote value']
+        )
+        self.assertEqual(
+            outer_form.get_nested_errors().get_json_data()['middle'],
+            {'form_field': {'inner_field': [{'message': 'Invalid remote value', 'code': 'remote'}]}}
+        )
+
+    def test_not_run_for_invalid_fields(self):
+        outer_form = self.form_class(self.get_data(**{'f0-inner_field': ''}))
+        self.assertFalse(run(outer_form.ais_valid()))
+        self.assertEqual(self.validator.max_running, 2)
+
+    def test_unbound(self):
+        self.assertFalse(run(self.form_class().ais_valid()))
+
+
+class AsyncSaveTestCase(TransactionTestCase):
+
+    def test_asave(self):
+        case_form = forms.CaseModelForm({'name': 'Test case 1', 'no': 'x0001'})
+        self.assertTrue(run(case_form.ais_valid()), case_form.errors)
+        with ThreadPoolExecutor(1) as executor:
+            case = run(case_form.asave(executor=executor))
+        self.assertEqual(Case.objects.get(pk=case.pk).application.no, 'x0001')
+
+    def test_asave_no_commit(self):
+        case_form = forms.CaseModelForm({'name': 'Test case 1', 'no': 'x0001'})
+        case = run(case_form.asave(commit=False))
+        self.assertIsNone(case.pk)
+        self.assertEqual(Application.objects.count(), 0)
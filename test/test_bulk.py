@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from form_field_utils.bulk import bulk_save, SavePlan
+
+from . import forms
+from .models import Case, Application, Attachment
+from .test_formsetfield import management_data
+
+
+def get_case_forms(count, instances=None):
+    case_forms = []
+    for i in range(count):
+        data = {'name': 'case {}'.format(i), 'no': 'no {}'.format(i)}
+        instance = instances[i] if instances else None
+        case_form = forms.CaseModelForm(data, instance=instance)
+        assert case_form.is_valid(), case_form.errors
+        case_forms.append(case_form)
+    return case_forms
+
+
+class BulkSaveTestCase(TestCase):
+
+    def get_forms(self, count, instances=None):
+        return get_case_forms(count, instances)
+
+    def test_bulk_save_create(self):
+        cases = bulk_save(self.get_forms(3))
+        self.assertEqual(len(cases), 3)
+        self.assertEqual(Case.objects.count(), 3)
+        self.assertEqual(Application.objects.count(), 3)
+        for i, case in enumerate(cases):
+            self.assertIsNotNone(case.pk)
+            self.assertEqual(Case.objects.get(pk=case.pk).application.no, 'no {}'.format(i))
+
+    def test_bulk_save_inner_instances_in_one_query(self):
+        case_forms = self.get_forms(5)
+        # SAVEPOINT + 5条Case INSERT(SQLite无法通过bulk_create获取pk)
+        # + 1条Application INSERT + RELEASE SAVEPOINT
+        with self.assertNumQueries(8):
+            bulk_save(case_forms)
+
+    def test_bulk_save_update(self):
+        cases = [Case.objects.create(name='old case {}'.format(i)) for i in range(3)]
+        for case in cases:
+            Application.objects.create(no='old', case=case)
+        cases = list(Case.objects.select_related('application').order_by('pk'))
+        case_forms = self.get_forms(3, cases)
+        # SAVEPOINT + Case和Application各一条UPDATE + RELEASE SAVEPOINT
+        with self.assertNumQueries(4):
+            bulk_save(case_forms)
+        self.assertEqual(
+            list(Application.objects.order_by('case_id').values_list('no', 'case__name')),
+            [('no {}'.format(i), 'case {}'.format(i)) for i in range(3)]
+        )
+
+    def test_bulk_save_invalid_form_raise_exception(self):
+        case_form = forms.CaseModelForm({'no': 'x0001'})
+        with self.assertRaises(ValueError):
+            bulk_save([case_form])
+        self.assertEqual(Application.objects.count(), 0)
+
+
+class SavePlanTestCase(TestCase):
+
+    def assertPlannedQueries(self, plan):
+        # SAVEPOINT和RELEASE SAVEPOINT不计入planned_query_count
+        with self.assertNumQueries(plan.planned_query_count + 2):
+            return plan.execute()
+
+    def test_levels_ordered_by_dependency(self):
+        case_form = forms.CaseWithAttachmentsModelForm(dict(
+            management_data('attachments', 2),
+            **{'name': 'case', 'no': 'x0001', 'attachments-0-name': 'new 0'}
+        ))
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        plan = case_form.get_save_plan()
+        self.assertEqual(
+            [list(writes) for level, writes in plan.levels],
+            [[Case], [Application, Attachment]]
+        )
+        self.assertEqual(plan.planned_query_count, 3)
+        case, = self.assertPlannedQueries(plan)
+        self.assertEqual(case.application.no, 'x0001')
+        self.assertEqual(list(case.attachments.values_list('name', flat=True)), ['new 0'])
+
+    def test_planned_query_count_for_create(self):
+        plan = SavePlan(get_case_forms(5), batch_size=2)
+        # SQLite无法通过bulk_create获取pk：5条Case INSERT + 3个batch的Application INSERT
+        self.assertEqual(plan.planned_query_count, 8)
+        self.assertPlannedQueries(plan)
+        self.assertEqual(Application.objects.count(), 5)
+
+    def test_planned_query_count_with_deletes(self):
+        case = Case.objects.create(name='case')
+        Application.objects.create(no='x0001', case=case)
+        attachments = [Attachment.objects.create(name='attachment {}'.format(i), case=case)
+                       for i in range(3)]
+        data = dict(management_data('attachments', 4, 3), name='case', no='x0002')
+        for i, attachment in enumerate(attachments):
+            data['attachments-{}-id'.format(i)] = str(attachment.pk)
+            data['attachments-{}-name'.format(i)] = 'changed {}'.format(i)
+        data['attachments-0-DELETE'] = 'on'
+        data['attachments-3-name'] = 'new 3'
+        case_form = forms.CaseWithAttachmentsModelForm(data, instance=case)
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        plan = case_form.get_save_plan()
+        # DELETE + Case UPDATE + Application UPDATE + Attachment INSERT和UPDATE
+        self.assertEqual(plan.planned_query_count, 5)
+        self.assertFalse(plan.has_cascading_deletes)
+        self.assertPlannedQueries(plan)
+        self.assertEqual(
+            sorted(case.attachments.values_list('name', flat=True)),
+            ['changed 1', 'changed 2', 'new 3']
+        )
+
+    def test_planned_query_count_lower_bound_for_cascades(self):
+        case = Case.objects.create(name='case')
+        Application.objects.create(no='x0001', case=case)
+        Attachment.objects.create(name='attachment', case=case)
+        plan = SavePlan([])
+        plan.deletes[Case] = [case]
+        self.assertTrue(plan.has_cascading_deletes)
+        with CaptureQueriesContext(connection) as queries:
+            plan.execute()
+        self.assertGreater(len(queries) - 2, plan.planned_query_count)
+        self.assertFalse(Attachment.objects.exists())
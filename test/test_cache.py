@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from django import forms as django_forms
+from django.core.exceptions import FieldError
+from django.test import TestCase
+
+from form_field_utils.cache import (
+    get_compiled_form_class, COMPILED_FORM_CLASS_CACHE_SIZE,
+    get_modelform_class, warm_modelform_cache, clear_modelform_cache,
+    _modelform_classes, LocMemRenderCache, DjangoRenderCache
+)
+from form_field_utils.fields import FormField, ModelFormField, ModelFormSetField
+from form_field_utils.forms import FormFieldSupportMixin, ModelFormFieldSupportMixin
+
+from .forms import InnerForm, OuterForm, ModelInnerForm, AttachmentModelForm
+from .models import TestModel, Case, Attachment
+
+
+class CompiledFormClassTestCase(TestCase):
+
+    def test_default_options_return_form_class(self):
+        self.assertIs(get_compiled_form_class(InnerForm), InnerForm)
+
+    def test_compiled_form_class_is_cached(self):
+        form_class = get_compiled_form_class(InnerForm, False, True, 'inner')
+        self.assertIs(get_compiled_form_class(InnerForm, False, True, 'inner'), form_class)
+        self.assertIsNot(get_compiled_form_class(InnerForm, False, False, 'inner'), form_class)
+
+    def test_compiled_form_class_options_applied(self):
+        form_class = get_compiled_form_class(InnerForm, False, True, 'inner')
+        self.assertTrue(issubclass(form_class, InnerForm))
+        form = form_class()
+        self.assertEqual(form.prefix, 'inner')
+        for field in form.fields.values():
+            self.assertFalse(field.required)
+            self.assertTrue(field.disabled)
+
+    def test_compiled_form_class_not_change_form_class(self):
+        get_compiled_form_class(InnerForm, False, True, 'inner')
+        self.assertTrue(InnerForm.base_fields['inner_field'].required)
+        self.assertFalse(InnerForm.base_fields['inner_field'].disabled)
+
+    def test_cache_is_bounded(self):
+        self.assertEqual(
+            get_compiled_form_class.cache_info().maxsize,
+            COMPILED_FORM_CLASS_CACHE_SIZE
+        )
+
+    def test_disabled_changed_after_inner_form_built(self):
+        outer_form = OuterForm()
+        inner_form = outer_form['form_field'].inner_form
+        outer_form.fields['form_field'].disabled = True
+        self.assertIs(outer_form['form_field'].inner_form, inner_form)
+        self.assertTrue(inner_form.fields['inner_field'].disabled)
+        outer_form.fields['form_field'].disabled = False
+        self.assertFalse(outer_form['form_field'].inner_form.fields['inner_field'].disabled)
+
+
+class ModelFormClassCacheTestCase(TestCase):
+
+    def tearDown(self):
+        clear_modelform_cache()
+
+    def test_same_declaration_share_form_class(self):
+        form_class = get_modelform_class(TestModel, ['field_0'])
+        self.assertIs(get_modelform_class(TestModel, ('field_0',)), form_class)
+        self.assertIsNot(get_modelform_class(TestModel, ['field_0', 'field_1']), form_class)
+        self.assertEqual(list(form_class.base_fields), ['field_0'])
+
+    def test_model_form_fields_share_form_class(self):
+        field_0 = ModelFormField(model=TestModel, fields=['field_1'])
+        field_1 = ModelFormField(model=TestModel, fields=['field_1'])
+        self.assertIs(field_0.form_class, field_1.form_class)
+
+    def test_warm_and_clear(self):
+        clear_modelform_cache()
+        warm_modelform_cache([(TestModel, ['field_0'])])
+        self.assertIn((TestModel, ('field_0',), django_forms.ModelForm), _modelform_classes)
+        clear_modelform_cache()
+        self.assertEqual(_modelform_classes, {})
+
+    def test_warm_fail_silently(self):
+        with self.assertRaises(FieldError):
+            warm_modelform_cache([(TestModel, ['not_existed'])])
+        warm_modelform_cache([(TestModel, ['not_existed'])], fail_silently=True)
+
+    def test_metaclass_warm_cache(self):
+        clear_modelform_cache()
+
+        class WarmedForm(FormFieldSupportMixin, django_forms.Form):
+            form_field = ModelFormField(model=TestModel, fields=['field_0', 'field_1'])
+
+        key = (TestModel, ('field_0', 'field_1'), django_forms.ModelForm)
+        self.assertIn(key, _modelform_classes)
+        self.assertIs(WarmedForm()['form_field'].field.form_class, _modelform_classes[key])
+
+
+class LocMemRenderCacheTestCase(TestCase):
+
+    def test_lru_eviction(self):
+        cache = LocMemRenderCache(maxsize=2)
+        cache.set('a', 'A')
+        cache.set('b', 'B')
+        self.assertEqual(cache.get('a'), 'A')
+        cache.set('c', 'C')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertEqual(cache.get('c'), 'C')
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+
+
+class RenderCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.render_cache = LocMemRenderCache()
+
+        class CachedForm(FormFieldSupportMixin, django_forms.Form):
+            form_field = FormField(form_class=InnerForm, render_cache=self.render_cache)
+
+        self.form_class = CachedForm
+
+    def render(self, *args, **kwargs):
+        with mock.patch('form_field_utils.widgets.FormInput.render', autospec=True,
+                        side_effect=lambda *a, **kw: 'html') as render:
+            html = str(self.form_class(*args, **kwargs)['form_field'])
+        return html, render.call_count
+
+    def test_unbound_render_cached(self):
+        self.assertEqual(self.render(), ('html', 1))
+        self.assertEqual(self.render(), ('html', 0))
+
+    def test_cache_result_same_as_uncached(self):
+        cached = str(self.form_class()['form_field'])
+        self.assertEqual(str(self.form_class()['form_field']), cached)
+        self.form_class.base_fields['form_field'].render_cache = None
+        try:
+            self.assertEqual(cached, str(self.form_class()['form_field']))
+        finally:
+            self.form_class.base_fields['form_field'].render_cache = self.render_cache
+
+    def test_initial_changes_key(self):
+        self.render()
+        self.assertEqual(self.render(initial={'form_field': {'inner_field': 'val'}})[1], 1)
+
+    def test_unserializable_initial_bypass(self):
+        initial = {'form_field': {'inner_field': TestModel(pk=1, field_0='a')}}
+        self.assertEqual(self.render(initial=initial)[1], 1)
+        self.assertEqual(self.render(initial=initial)[1], 1)
+        self.assertEqual(len(self.render_cache._data), 0)
+
+    def test_bound_form_bypass(self):
+        self.assertEqual(self.render({})[1], 1)
+        self.assertEqual(self.render({})[1], 1)
+        self.assertEqual(len(self.render_cache._data), 0)
+
+    def test_disabled_changes_key(self):
+        form = self.form_class()
+        form.fields['form_field'].disabled = True
+        html = str(form['form_field'])
+        self.assertIn('disabled', html)
+        self.assertNotIn('disabled', str(self.form_class()['form_field']))
+
+    def test_model_form_field_with_instance_bypass(self):
+        render_cache = LocMemRenderCache()
+
+        class CachedModelForm(FormFieldSupportMixin, django_forms.Form):
+            form_field = ModelFormField(form_class=ModelInnerForm, render_cache=render_cache)
+
+        form = CachedModelForm()
+        str(form['form_field'])
+        self.assertEqual(len(render_cache._data), 1)
+        form = CachedModelForm()
+        form.fields['form_field'].instance = TestModel(field_0='val')
+        str(form['form_field'])
+        self.assertEqual(len(render_cache._data), 1)
+
+    def test_model_formset_field_with_parent_instance_bypass(self):
+        render_cache = LocMemRenderCache()
+
+        class CachedCaseModelForm(ModelFormFieldSupportMixin, django_forms.ModelForm):
+            attachments = ModelFormSetField(
+                AttachmentModelForm, prefix='attachments', render_cache=render_cache
+            )
+
+            class Meta:
+                model = Case
+                fields = '__all__'
+
+        case_a, case_b = Case.objects.create(name='a'), Case.objects.create(name='b')
+        Attachment.objects.create(name='secret-of-A', case=case_a)
+        Attachment.objects.create(name='file-of-B', case=case_b)
+
+        html_a = str(CachedCaseModelForm(instance=case_a)['attachments'])
+        html_b = str(CachedCaseModelForm(instance=case_b)['attachments'])
+        self.assertIn('secret-of-A', html_a)
+        self.assertIn('file-of-B', html_b)
+        self.assertNotIn('secret-of-A', html_b)
+        self.assertEqual(len(render_cache._data), 0)
+
+        # 新建时parent instance没有关联的对象，仍然可以使用缓存
+        str(CachedCaseModelForm()['attachments'])
+        self.assertEqual(len(render_cache._data), 1)
+
+    def test_django_cache_backend(self):
+        render_cache = DjangoRenderCache()
+        render_cache.clear()
+        self.form_class.base_fields['form_field'].render_cache = render_cache
+        try:
+            self.assertEqual(self.render(), ('html', 1))
+            self.assertEqual(self.render(), ('html', 0))
+        finally:
+            render_cache.clear()
+
+    def test_django_cache_clear_keeps_other_keys(self):
+        render_cache = DjangoRenderCache()
+        render_cache.cache.set('other_key', 'value')
+        render_cache.set('key', 'html')
+        self.assertEqual(render_cache.get('key'), 'html')
+        render_cache.clear()
+        self.assertIsNone(render_cache.get('key'))
+        self.assertEqual(render_cache.cache.get('other_key'), 'value')
+        render_cache.cache.delete('other_key')
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+from django import forms as django_forms
+from django.test import TestCase
+from django.http import QueryDict
+
+from form_field_utils.data import PrefixIndex, PrefixedData
+from form_field_utils.fields import FormField
+from form_field_utils.forms import FormFieldSupportMixin
+
+from . import forms
+
+
+class AddressForm(django_forms.Form):
+    street = django_forms.CharField()
+
+
+class GroupForm(FormFieldSupportMixin, django_forms.Form):
+    addr = FormField(AddressForm, prefix='addr')
+
+
+class GroupOuterForm(FormFieldSupportMixin, django_forms.Form):
+    name = django_forms.CharField()
+    grp = FormField(GroupForm, prefix='grp')
+
+
+class PrefixIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.data = QueryDict('a=0&p-a=1&p-b=2&p-b=3&p-q-c=4&q-c=5', mutable=False)
+        self.index = PrefixIndex(self.data)
+
+    def test_view_only_contains_prefixed_keys(self):
+        view = self.index.view('p')
+        self.assertEqual(sorted(view), ['p-a', 'p-b', 'p-q-c'])
+        self.assertEqual(len(view), 3)
+        self.assertIn('p-a', view)
+        self.assertNotIn('q-c', view)
+        self.assertNotIn('a', view)
+
+    def test_nested_prefix(self):
+        self.assertEqual(sorted(self.index.view('p-q')), ['p-q-c'])
+        self.assertEqual(sorted(self.index.view('q')), ['q-c'])
+        self.assertEqual(len(self.index.view('x')), 0)
+
+    def test_view_lookups_delegate_to_data(self):
+        view = self.index.view('p')
+        self.assertEqual(view['p-b'], '3')
+        self.assertEqual(view.get('p-b'), '3')
+        self.assertEqual(view.getlist('p-b'), ['2', '3'])
+        self.assertIsNone(view.get('q-c'))
+        self.assertEqual(view.getlist('q-c'), [])
+        with self.assertRaises(KeyError):
+            view['a']
+
+    def test_view_without_prefix_contains_all_keys(self):
+        view = self.index.view(None)
+        self.assertEqual(len(view), len(self.data))
+        self.assertIn('a', view)
+
+    def test_plain_dict_view_has_no_getlist(self):
+        view = PrefixIndex({'p-a': '1'}).view('p')
+        self.assertFalse(hasattr(view, 'getlist'))
+
+    def test_index_shared_by_nested_forms(self):
+        outer_form = forms.OuterForm({
+            'other_field_0': 'val0',
+            'other_field_1': 'val1',
+            'form_field-inner_field': 'inner_val0',
+        })
+        inner_form = outer_form['form_field'].inner_form
+        self.assertIsInstance(inner_form.data, PrefixedData)
+        self.assertIs(inner_form.data.index, outer_form.data_index)
+        self.assertEqual(list(inner_form.data), ['form_field-inner_field'])
+        self.assertEqual(outer_form['form_field'].data['inner_field'], 'inner_val0')
+
+    def test_index_shared_through_form_without_own_keys(self):
+        # grp下没有任何键，GroupForm的data是空的{}，addr仍然使用最外层form的索引
+        outer_form = GroupOuterForm({'name': 'n', 'addr-street': 'x'})
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['grp'], {'addr': {'street': 'x'}})
+        self.assertIs(outer_form['grp'].inner_form.data_index, outer_form.data_index)
+
+    def test_prefixed_data_validation(self):
+        outer_form = forms.OuterForm(QueryDict(
+            'other_field_0=val0&other_field_1=val1&form_field-inner_field=inner_val0'
+            '&form_field-inner_field_with_inner_form_initial=inner_val1'
+            '&form_field-inner_field_with_outer_form_initial=inner_val2'
+        ))
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['form_field']['inner_field'], 'inner_val0')
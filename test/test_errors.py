@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from django.test import TestCase
+from django.utils.functional import Promise
+
+from form_field_utils.errors import NestedValidationError, NestedErrorDict
+
+from . import forms
+from .test_formsetfield import management_data
+from .test_schema import DeepOuterForm, FlatDeepOuterForm
+
+
+class NestedErrorsTestCase(TestCase):
+
+    def get_outer_form(self):
+        outer_form = forms.OuterForm({
+            'other_field_0': 'val0',
+            'form_field-inner_field': 'inner_val0',
+        })
+        self.assertFalse(outer_form.is_valid())
+        return outer_form
+
+    def test_inner_errors_not_mutated(self):
+        outer_form = self.get_outer_form()
+        inner_form = outer_form['form_field'].inner_form
+        self.assertEqual(
+            inner_form.errors['inner_field_with_outer_form_initial'], ['This field is required.']
+        )
+        self.assertIn(
+            'Field inner_field_with_outer_form_initial in FormField: This field is required.',
+            outer_form.errors['form_field']
+        )
+
+    def test_message_formatted_lazily(self):
+        error = self.get_outer_form().errors.as_data()['form_field'][0]
+        self.assertIsInstance(error, NestedValidationError)
+        self.assertIsInstance(error.message, Promise)
+        self.assertEqual(error.path, ('inner_field_with_inner_form_initial',))
+        self.assertEqual(error.code, 'required')
+        self.assertEqual(error.leaf.message, 'This field is required.')
+
+    def test_get_json_data(self):
+        errors = self.get_outer_form().get_nested_errors()
+        self.assertIsInstance(errors, NestedErrorDict)
+        required = [{'message': 'This field is required.', 'code': 'required'}]
+        self.assertEqual(errors.get_json_data(), {
+            'other_field_1': required,
+            'form_field': {
+                'inner_field_with_inner_form_initial': required,
+                'inner_field_with_outer_form_initial': required,
+            },
+        })
+        self.assertEqual(json.loads(errors.as_json()), errors.get_json_data())
+
+    def test_deep_nested_errors(self):
+        data = {
+            'other_field': 'val',
+            'middle-middle_field': '11',
+            'middle-inner-inner_field_with_inner_form_initial': 'inner_val1',
+            'middle-inner-inner_field_with_outer_form_initial': 'inner_val2',
+        }
+        errors = DeepOuterForm(data).get_nested_errors().get_json_data()
+        self.assertEqual(errors, FlatDeepOuterForm(data).get_nested_errors().get_json_data())
+        self.assertEqual(errors['middle']['middle_field'][0]['code'], 'max_value')
+        self.assertEqual(
+            errors['middle']['middle_field'][0]['message'],
+            'Ensure this value is less than or equal to 10.'
+        )
+        self.assertEqual(
+            errors['middle']['form_field']['inner_field'][0]['code'], 'required'
+        )
+
+    def test_formset_errors(self):
+        data = {'other_field': 'val', 'items-0-name': 'item 0', 'items-0-quantity': 'x'}
+        data.update(management_data('items', 1))
+        errors = forms.OuterFormWithFormSet(data).get_nested_errors().get_json_data()
+        self.assertEqual(errors, {'items': {0: {'quantity': [
+            {'message': 'Enter a whole number.', 'code': 'invalid'}
+        ]}}})
+
+    def test_escape_html(self):
+        outer_form = forms.OuterForm({})
+        outer_form.add_error(None, '<b>error</b>')
+        errors = outer_form.get_nested_errors().get_json_data(escape_html=True)
+        self.assertEqual(errors['__all__'][0]['message'], '&lt;b&gt;error&lt;/b&gt;')
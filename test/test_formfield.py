@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import copy
+from unittest import mock
 
 from django.test import TestCase
 from django.forms.fields import BoundField
@@ -130,6 +131,24 @@ class FormFieldTestCase(TestCase):
             expected
         )
 
+    def test_form_field_validation_reuses_inner_form(self):
+        outer_form = OuterForm(self.outer_form_data)
+        inner_form = outer_form['form_field'].inner_form
+        with mock.patch.object(InnerForm, 'full_clean', autospec=True,
+                               side_effect=InnerForm.full_clean) as full_clean:
+            outer_form.full_clean()
+            outer_form.as_p()
+        self.assertEqual(full_clean.call_count, 1)
+        self.assertIs(outer_form['form_field'].inner_form, inner_form)
+
+    def test_form_field_inner_form_built_once(self):
+        outer_form = OuterForm(self.outer_form_data)
+        with mock.patch.object(FormField, 'get_form', autospec=True,
+                               side_effect=FormField.get_form) as get_form:
+            outer_form.is_valid()
+            outer_form.as_p()
+        self.assertEqual(get_form.call_count, 1)
+
     def test_form_field_required_false_no_render(self):
         self.outer_form.fields['form_field'].required = False
         form_field = self.outer_form['form_field']
@@ -166,3 +185,45 @@ class FormFieldTestCase(TestCase):
             id="id_form_field-inner_field_with_outer_form_initial" required disabled />""",
             html
         )
+
+    def test_form_field_deepcopy(self):
+        field = OuterForm.base_fields['form_field']
+        field.form_class
+        field_copy = copy.deepcopy(field)
+        self.assertIsNot(field_copy, field)
+        self.assertIs(field_copy.form_class, field.form_class)
+        self.assertIs(field_copy.initial, field.initial)
+        self.assertIsNot(field_copy.widget, field.widget)
+        self.assertIsNot(field_copy.widget.attrs, field.widget.attrs)
+        self.assertIsNot(field_copy.validators, field.validators)
+        self.assertIsNone(field_copy.bound_field)
+
+    def test_form_field_not_share_bound_field(self):
+        outer_form_0, outer_form_1 = OuterForm(), OuterForm()
+        self.assertIs(outer_form_0['form_field'].form, outer_form_0)
+        self.assertIs(outer_form_1['form_field'].form, outer_form_1)
+        outer_form_0.fields['form_field'].widget.attrs['class'] = 'changed'
+        self.assertNotIn('class', outer_form_1.fields['form_field'].widget.attrs)
+
+    def test_form_field_data_and_initial_memoized(self):
+        outer_form = OuterForm(self.outer_form_data)
+        bound_field = outer_form['form_field']
+        self.assertIs(bound_field.data, bound_field.data)
+        self.assertIs(bound_field.initial, bound_field.initial)
+        with mock.patch('django.forms.boundfield.BoundField.data', new_callable=mock.PropertyMock) as data:
+            bound_field.data
+        data.assert_not_called()
+
+    def test_form_field_invalidate(self):
+        outer_form = OuterForm(self.outer_form_data)
+        bound_field = outer_form['form_field']
+        inner_form = bound_field.inner_form
+        self.assertEqual(bound_field.data['inner_field'], 'inner_val0')
+
+        outer_form.data = dict(self.outer_form_data, **{'form_field-inner_field': 'changed'})
+        outer_form.initial = {'form_field': {'inner_field_with_initial': 'changed'}}
+        self.assertEqual(bound_field.data['inner_field'], 'inner_val0')
+        outer_form.invalidate_form_fields()
+        self.assertIsNot(bound_field.inner_form, inner_form)
+        self.assertEqual(bound_field.data['inner_field'], 'changed')
+        self.assertEqual(bound_field.initial['inner_field_with_initial'], 'changed')
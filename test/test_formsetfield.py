@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+from django.core.exceptions import ImproperlyConfigured
+
+from form_field_utils.bulk import bulk_save
+from form_field_utils.fields import FormSetField, ModelFormSetField
+from form_field_utils.forms import ModelFormFieldSupportMixin
+
+from . import forms
+from .models import Case, Application, Attachment
+
+
+def management_data(prefix, total, initial=0):
+    return {
+        '{}-TOTAL_FORMS'.format(prefix): str(total),
+        '{}-INITIAL_FORMS'.format(prefix): str(initial),
+        '{}-MIN_NUM_FORMS'.format(prefix): '0',
+        '{}-MAX_NUM_FORMS'.format(prefix): '1000',
+    }
+
+
+class FormSetFieldTestCase(TestCase):
+
+    def get_data(self, **kwargs):
+        data = {
+            'other_field': 'val0',
+            'items-0-name': 'item 0',
+            'items-0-quantity': '1',
+            'items-1-name': 'item 1',
+            'items-1-quantity': '2',
+        }
+        data.update(management_data('items', 3))
+        data.update(kwargs)
+        return data
+
+    def test_formset_field_is_collected(self):
+        self.assertIn('items', forms.OuterFormWithFormSet.form_fields)
+
+    def test_can_render(self):
+        html = forms.OuterFormWithFormSet().as_p()
+        self.assertIn('name="items-TOTAL_FORMS"', html)
+        self.assertIn('name="items-0-name"', html)
+
+    def test_can_render_with_template(self):
+        outer_form = forms.OuterFormWithFormSet()
+        html = outer_form['items'].as_widget(using_template=True)
+        self.assertIn('name="items-TOTAL_FORMS"', html)
+
+    def test_get_cleaned_data(self):
+        outer_form = forms.OuterFormWithFormSet(self.get_data())
+        self.assertTrue(outer_form.is_valid())
+        self.assertEqual(outer_form.cleaned_data['items'], [
+            {'name': 'item 0', 'quantity': 1, 'DELETE': False},
+            {'name': 'item 1', 'quantity': 2, 'DELETE': False},
+        ])
+
+    def test_deleted_form_not_in_cleaned_data(self):
+        outer_form = forms.OuterFormWithFormSet(self.get_data(**{'items-0-DELETE': 'on'}))
+        self.assertTrue(outer_form.is_valid())
+        self.assertEqual([item['name'] for item in outer_form.cleaned_data['items']], ['item 1'])
+
+    def test_validation(self):
+        outer_form = forms.OuterFormWithFormSet(self.get_data(**{'items-1-quantity': 'x'}))
+        self.assertFalse(outer_form.is_valid())
+        self.assertEqual(len(outer_form.errors['items']), 1)
+        self.assertIn('Field quantity of form 1 in FormSetField', outer_form.errors['items'][0])
+
+    def test_required_formset_field_empty(self):
+        data = management_data('items', 1)
+        data['other_field'] = 'val0'
+        outer_form = forms.OuterFormWithFormSet(data)
+        self.assertFalse(outer_form.is_valid())
+        self.assertIn('items', outer_form.errors)
+
+    def test_bound_field_data(self):
+        outer_form = forms.OuterFormWithFormSet(self.get_data())
+        self.assertEqual(outer_form['items'].data[1], {'name': 'item 1', 'quantity': '2', 'DELETE': False})
+
+
+class ModelFormSetFieldTestCase(TestCase):
+
+    def setUp(self):
+        self.case = Case.objects.create(name='case')
+        Application.objects.create(no='x0001', case=self.case)
+        self.attachments = [
+            Attachment.objects.create(name='attachment {}'.format(i), case=self.case)
+            for i in range(3)
+        ]
+
+    def get_data(self, **kwargs):
+        data = {'name': 'case', 'no': 'x0001'}
+        data.update(management_data('attachments', 5, 3))
+        for i, attachment in enumerate(self.attachments):
+            data['attachments-{}-id'.format(i)] = str(attachment.pk)
+            data['attachments-{}-name'.format(i)] = attachment.name
+        data.update(kwargs)
+        return data
+
+    def test_modelformset_field_is_collected(self):
+        self.assertIn('attachments', forms.CaseWithAttachmentsModelForm.modelformset_fields)
+        self.assertNotIn('attachments', forms.CaseWithAttachmentsModelForm.modelform_fields)
+
+    def test_modelformset_field_model_match(self):
+
+        class ErrorCaseModelForm(ModelFormFieldSupportMixin, forms.forms.ModelForm):
+            attachments = ModelFormSetField(forms.TestModelForm)
+
+            class Meta:
+                model = Case
+                fields = '__all__'
+
+        with self.assertRaises(ImproperlyConfigured):
+            ErrorCaseModelForm()
+
+    def test_modelformset_field_requires_model_form(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ModelFormSetField(forms.AttachmentModelForm).get_form()
+
+    def test_formset_field_requires_form_class(self):
+        with self.assertRaises(ImproperlyConfigured):
+            FormSetField(str).get_form()
+
+    def test_render_existing_objects(self):
+        html = forms.CaseWithAttachmentsModelForm(instance=self.case).as_p()
+        self.assertIn('value="attachment 2"', html)
+
+    def test_save_create(self):
+        data = management_data('attachments', 2)
+        data.update({'name': 'new case', 'no': 'x0002', 'attachments-0-name': 'new 0',
+                     'attachments-1-name': 'new 1'})
+        case_form = forms.CaseWithAttachmentsModelForm(data)
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        case = case_form.save()
+        self.assertEqual(
+            sorted(case.attachments.values_list('name', flat=True)), ['new 0', 'new 1']
+        )
+
+    def test_save_bulk_writes(self):
+        data = self.get_data(**{
+            'attachments-0-name': 'changed 0',
+            'attachments-1-name': 'changed 1',
+            'attachments-2-DELETE': 'on',
+            'attachments-3-name': 'new 3',
+            'attachments-4-name': 'new 4',
+        })
+        case_form = forms.CaseWithAttachmentsModelForm(data, instance=self.case)
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        formset = case_form['attachments'].inner_form
+        save_forms, deleted = formset.get_bulk_save_forms()
+        self.assertEqual(len(save_forms), 4)
+        self.assertEqual(deleted, [self.attachments[2]])
+
+        with self.assertNumQueries(5):
+            # SAVEPOINT + DELETE + INSERT + UPDATE + RELEASE SAVEPOINT
+            formset.save()
+        self.assertEqual(
+            sorted(self.case.attachments.values_list('name', flat=True)),
+            ['changed 0', 'changed 1', 'new 3', 'new 4']
+        )
+
+    def test_delete_rolled_back_with_failed_writes(self):
+        data = self.get_data(**{'attachments-0-DELETE': 'on', 'attachments-3-name': 'new 3'})
+        case_form = forms.CaseWithAttachmentsModelForm(data, instance=self.case)
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        formset = case_form['attachments'].inner_form
+        with mock.patch('form_field_utils.bulk.bulk_write', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                formset.save()
+        self.assertEqual(self.case.attachments.count(), 3)
+
+    def test_bulk_save_with_formset(self):
+        case_form = forms.CaseWithAttachmentsModelForm(
+            self.get_data(**{'attachments-0-DELETE': 'on', 'attachments-3-name': 'new 3'}),
+            instance=self.case
+        )
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        bulk_save([case_form])
+        self.assertEqual(
+            sorted(self.case.attachments.values_list('name', flat=True)),
+            ['attachment 1', 'attachment 2', 'new 3']
+        )
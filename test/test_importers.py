@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from django.test import TestCase
+
+from form_field_utils import bulk
+from form_field_utils.importers import FormImporter, import_records
+
+from . import forms
+from .models import Case, Application
+
+
+class FormImporterTestCase(TestCase):
+
+    def get_records(self, count):
+        for i in range(count):
+            yield {'name': 'case {}'.format(i), 'no': 'x{:04d}'.format(i)}
+
+    def test_import_records(self):
+        results = list(import_records(forms.CaseModelForm, self.get_records(5), chunk_size=2))
+        self.assertEqual(sorted(result.index for result in results), list(range(5)))
+        self.assertTrue(all(result.errors is None for result in results))
+        self.assertEqual(Case.objects.count(), 5)
+        for result in results:
+            self.assertEqual(result.instance.application.no, result.record['no'])
+            self.assertEqual(Application.objects.get(no=result.record['no']).case, result.instance)
+
+    def test_one_bulk_save_per_chunk(self):
+        importer = FormImporter(forms.CaseModelForm, chunk_size=2)
+        with mock.patch('form_field_utils.importers.bulk_save', wraps=bulk.bulk_save) as bulk_save:
+            list(importer.iter_results(self.get_records(5)))
+        self.assertEqual([len(c[0][0]) for c in bulk_save.call_args_list], [2, 2, 1])
+
+    def test_lazy_validation(self):
+        records = iter(self.get_records(5))
+        results = FormImporter(forms.CaseModelForm, chunk_size=2).iter_results(records)
+        next(results)
+        # 只处理了第一个chunk
+        self.assertEqual(len(list(records)), 3)
+
+    def test_invalid_records_report_nested_errors(self):
+        records = [
+            {'name': 'case 0', 'no': 'x0000'},
+            {'name': 'case 1', 'no': ''},
+            {'name': '', 'no': 'x0002'},
+        ]
+        results = list(import_records(forms.CaseModelForm, records, chunk_size=10))
+        # 未通过校验的记录立即产生
+        self.assertEqual([result.index for result in results], [1, 2, 0])
+        self.assertIsNone(results[0].instance)
+        self.assertEqual(
+            results[0].errors.get_json_data(),
+            {'application': {'no': [{'message': 'This field is required.', 'code': 'required'}]}}
+        )
+        self.assertIn('name', results[1].errors.get_json_data())
+        self.assertEqual(list(Case.objects.values_list('name', flat=True)), ['case 0'])
+
+    def test_nested_records(self):
+        records = [{
+            'name': 'case 0',
+            'application': {'no': 'x0000'},
+            'attachments': [{'name': 'attachment 0'}, {'name': 'attachment 1'}],
+        }]
+        result, = import_records(forms.CaseWithAttachmentsModelForm, records, nested=True)
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.instance.application.no, 'x0000')
+        self.assertEqual(result.instance.attachments.count(), 2)
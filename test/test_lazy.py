@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from django import forms as django_forms
+from django.test import TestCase
+
+from form_field_utils.fields import FormField, ModelFormField, FormSetField, ModelFormSetField
+from form_field_utils.forms import FormFieldSupportMixin, ModelFormFieldSupportMixin
+
+from . import forms
+from .models import Case, Application
+
+
+class LazyOuterForm(FormFieldSupportMixin, django_forms.Form):
+    other_field = django_forms.CharField()
+    section = FormField(forms.InnerForm, prefix='section', required=False, lazy=True)
+    items = FormSetField(forms.ItemForm, prefix='items', required=False, lazy=True)
+
+
+class AddressForm(django_forms.Form):
+    street = django_forms.CharField()
+
+
+class GroupForm(FormFieldSupportMixin, django_forms.Form):
+    addr = FormField(AddressForm, prefix='addr')
+
+
+class LazyGroupOuterForm(FormFieldSupportMixin, django_forms.Form):
+    name = django_forms.CharField()
+    grp = FormField(GroupForm, prefix='grp', required=False, lazy=True)
+
+
+class LazyCaseModelForm(ModelFormFieldSupportMixin, django_forms.ModelForm):
+    application = ModelFormField(
+        forms.ApplicationModelForm, prefix='application', required=False, lazy=True
+    )
+    attachments = ModelFormSetField(
+        forms.AttachmentModelForm, prefix='attachments', required=False, lazy=True
+    )
+
+    class Meta:
+        model = Case
+        fields = '__all__'
+
+
+class LazyFormFieldTestCase(TestCase):
+
+    def test_absent_inner_form_not_built(self):
+        outer_form = LazyOuterForm({'other_field': 'val'})
+        with mock.patch.object(FormField, 'get_form') as get_form:
+            self.assertTrue(outer_form.is_valid(), outer_form.errors)
+            self.assertEqual(outer_form.changed_data, ['other_field'])
+        get_form.assert_not_called()
+        self.assertEqual(outer_form.cleaned_data['section'], {})
+        self.assertEqual(outer_form.cleaned_data['items'], [])
+
+    def test_submitted_inner_form_validated(self):
+        outer_form = LazyOuterForm({'other_field': 'val', 'section-inner_field': 'inner_val'})
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['section']['inner_field'], 'inner_val')
+        self.assertEqual(outer_form.cleaned_data['items'], [])
+
+    def test_not_lazy_when_required(self):
+        outer_form = LazyOuterForm({'other_field': 'val'})
+        outer_form.fields['section'].required = True
+        self.assertFalse(outer_form['section'].is_absent())
+        self.assertFalse(outer_form.is_valid())
+        self.assertIn('section', outer_form.errors)
+
+    def test_nested_data(self):
+        outer_form = LazyOuterForm({'other_field': 'val'}, nested=True)
+        self.assertTrue(outer_form['section'].is_absent())
+        outer_form = LazyOuterForm({'other_field': 'val', 'section': {'inner_field': 'x'}}, nested=True)
+        self.assertFalse(outer_form['section'].is_absent())
+
+    def test_nested_prefix_outside_field_prefix(self):
+        # grp本身没有任何键，数据都在嵌套的addr的prefix下
+        outer_form = LazyGroupOuterForm({'name': 'n', 'addr-street': 'Main St'})
+        self.assertFalse(outer_form['grp'].is_absent())
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['grp'], {'addr': {'street': 'Main St'}})
+
+        outer_form = LazyGroupOuterForm({'name': 'n'})
+        self.assertTrue(outer_form['grp'].is_absent())
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['grp'], {})
+
+    def test_unbound_render(self):
+        html = LazyOuterForm().as_table()
+        self.assertIn('name="section-inner_field"', html)
+
+
+class LazyModelFormFieldTestCase(TestCase):
+
+    def test_absent_sections_not_saved(self):
+        case_form = LazyCaseModelForm({'name': 'case'})
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        case = case_form.save()
+        self.assertEqual(Application.objects.count(), 0)
+        self.assertEqual(case.attachments.count(), 0)
+
+    def test_absent_sections_not_planned(self):
+        case_form = LazyCaseModelForm({'name': 'case'})
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        plan = case_form.get_save_plan()
+        self.assertEqual([list(writes) for level, writes in plan.levels], [[Case]])
+
+    def test_submitted_section_saved(self):
+        case_form = LazyCaseModelForm({'name': 'case', 'application-no': 'x0001'})
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        case = case_form.save()
+        self.assertEqual(case.application.no, 'x0001')
@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 
 
+from unittest import mock
+
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ImproperlyConfigured
 from django import forms as django_forms
+from django.db import connection
 
+from form_field_utils.bulk import bulk_save
 from form_field_utils.forms import ModelFormFieldSupportMixin
 from form_field_utils.fields import ModelFormField
 from . import forms
-from .models import Case, Application
+from .models import Case, Application, TestModel
 
 
 class ModelFormMixinTestCase(TestCase):
@@ -51,6 +56,32 @@ class ModelFormMixinTestCase(TestCase):
         html = case_form.as_p()
         self.assertNotIn('Case:', html)
 
+    def test_get_select_related(self):
+        self.assertEqual(forms.CaseModelForm.get_select_related(), ['application'])
+        self.assertEqual(forms.ApplicationModelForm.get_select_related(), [])
+
+    def test_get_queryset_instance_resolution_no_extra_query(self):
+        empty_case = Case.objects.create(name='Test case 2')
+        with self.assertNumQueries(1):
+            cases = list(forms.CaseModelForm.get_queryset().order_by('pk'))
+            for case in cases:
+                forms.CaseModelForm(instance=case).as_p()
+        self.assertEqual(cases[1].pk, empty_case.pk)
+        inner_form = forms.CaseModelForm(instance=cases[0])['application'].inner_form
+        self.assertEqual(inner_form.instance.pk, self.application.pk)
+
+    def test_inner_form_not_built_on_init(self):
+        case_form = forms.CaseModelForm()
+        self.assertIsNone(case_form['application']._inner_form)
+        self.assertEqual(case_form.fields['application'].excluded_fields, ('case',))
+        self.assertNotIn('case', case_form['application'].inner_form.fields)
+
+    def test_modelform_fields_prepared_once_per_class(self):
+        forms.CaseModelForm()
+        self.assertTrue(forms.CaseModelForm.__dict__['_modelform_fields_prepared'])
+        with mock.patch.object(Case._meta, 'get_field', side_effect=AssertionError):
+            forms.CaseModelForm()
+
     def test_save_commit(self):
         outerform_data = {
             'name': 'Test case 2',
@@ -64,6 +95,15 @@ class ModelFormMixinTestCase(TestCase):
         app = Application.objects.filter(no='x0002').get()
         self.assertEqual(app.case.name, 'Test case 2')
 
+    def test_save_uses_validated_inner_form(self):
+        case_form = forms.CaseModelForm({'name': 'Test case 2', 'no': 'x0002'})
+        inner_form = case_form['application'].inner_form
+        self.assertTrue(case_form.is_valid())
+        self.assertIs(case_form['application'].inner_form, inner_form)
+        self.assertNotIn('case', inner_form.cleaned_data)
+        case_form.save()
+        self.assertEqual(Application.objects.get(no='x0002').id, inner_form.instance.id)
+
     def test_save_no_commit(self):
         outerform_data = {
             'name': 'Test case 2',
@@ -77,3 +117,111 @@ class ModelFormMixinTestCase(TestCase):
             case = Case.objects.filter(name='Test case 2').get()
         with self.assertRaises(Application.DoesNotExist):
             app = Application.objects.filter(no='x0002').get()
+
+
+class TrackedCaseModelForm(ModelFormFieldSupportMixin, django_forms.ModelForm):
+    application = ModelFormField(forms.ApplicationModelForm, track_changes=True)
+
+    class Meta:
+        model = Case
+        fields = '__all__'
+
+
+class RefApplicationModelForm(django_forms.ModelForm):
+    ref = django_forms.ModelChoiceField(TestModel.objects.all(), required=False)
+
+    class Meta:
+        model = Application
+        fields = '__all__'
+
+
+class RefCaseModelForm(ModelFormFieldSupportMixin, django_forms.ModelForm):
+    application = ModelFormField(RefApplicationModelForm)
+
+    class Meta:
+        model = Case
+        fields = '__all__'
+
+
+class TrackedRefCaseModelForm(RefCaseModelForm):
+    application = ModelFormField(RefApplicationModelForm, track_changes=True)
+
+
+class ChangeTrackingTestCase(TestCase):
+
+    def setUp(self):
+        self.case = Case.objects.create(name='Test case 1')
+        self.application = Application.objects.create(no='x0001', case=self.case)
+
+    def get_form(self, **data):
+        return TrackedCaseModelForm(data, instance=Case.objects.get(pk=self.case.pk))
+
+    def get_application_queries(self, queries):
+        return [q['sql'] for q in queries if 'test_application' in q['sql']]
+
+    def test_unchanged_inner_form_not_cleaned(self):
+        case_form = self.get_form(name='Test case 2', no='x0001')
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        self.assertEqual(case_form.cleaned_data['application'], {'no': 'x0001'})
+        self.assertIsNone(case_form['application'].inner_form._errors)
+        self.assertEqual(case_form.changed_data, ['name'])
+
+    def test_unchanged_inner_form_cleaned_initial(self):
+        ref = TestModel.objects.create(field_0='ref')
+        for form_class in (TrackedRefCaseModelForm, RefCaseModelForm):
+            case_form = form_class(
+                {'name': 'Test case 2', 'no': 'x0001', 'ref': str(ref.pk)},
+                instance=Case.objects.get(pk=self.case.pk),
+                initial={'application': {'ref': ref.pk}},
+            )
+            self.assertTrue(case_form.is_valid(), case_form.errors)
+            self.assertNotIn('application', case_form.changed_data)
+            # 与不使用track_changes时的cleaned_data类型相同
+            self.assertEqual(case_form.cleaned_data['application']['ref'], ref)
+
+    def test_unchanged_inner_form_not_saved(self):
+        case_form = self.get_form(name='Test case 2', no='x0001')
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        with CaptureQueriesContext(connection) as queries:
+            case_form.save()
+        self.assertEqual(self.get_application_queries(queries), [])
+        self.assertEqual(Case.objects.get(pk=self.case.pk).name, 'Test case 2')
+
+    def test_changed_inner_form_update_fields(self):
+        case_form = self.get_form(name='Test case 1', no='x0002')
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        self.assertEqual(case_form.changed_data, ['application'])
+        self.assertEqual(case_form['application'].get_update_fields(), ['no', 'case'])
+        with CaptureQueriesContext(connection) as queries:
+            case_form.save()
+        update, = self.get_application_queries(queries)
+        set_clause = update.split(' SET ')[1].split(' WHERE ')[0]
+        self.assertEqual(set_clause.count(' = '), 2)
+        self.assertIn('"no" = ', set_clause)
+        self.assertIn('"case_id" = ', set_clause)
+        self.assertEqual(Application.objects.get(pk=self.application.pk).no, 'x0002')
+
+    def test_invalid_changed_inner_form(self):
+        case_form = self.get_form(name='Test case 1', no='')
+        self.assertFalse(case_form.is_valid())
+        self.assertIn('application', case_form.errors)
+
+    def test_new_outer_instance_save_inner_form(self):
+        case_form = TrackedCaseModelForm({'name': 'Test case 2', 'no': 'x0002'})
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        case = case_form.save()
+        self.assertEqual(Application.objects.get(no='x0002').case, case)
+
+    def test_outer_save_update_fields(self):
+        case_form = self.get_form(name='Test case 2', no='x0001')
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        with mock.patch.object(Case, 'save', autospec=True) as save:
+            case_form.save(update_fields=['name'])
+        save.assert_called_once_with(case_form.instance, update_fields=['name'])
+
+    def test_bulk_save_skip_unchanged(self):
+        case_form = self.get_form(name='Test case 2', no='x0001')
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        with CaptureQueriesContext(connection) as queries:
+            bulk_save([case_form])
+        self.assertEqual(self.get_application_queries(queries), [])
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+from django import forms as django_forms
+from django.test import TestCase
+
+from form_field_utils.fields import FormField
+from form_field_utils.forms import FormFieldSupportMixin
+
+from . import forms
+from .models import Case, Attachment
+
+
+class MiddleForm(FormFieldSupportMixin, django_forms.Form):
+    middle_field = django_forms.CharField()
+    form_field = FormField(forms.InnerForm, prefix='inner')
+
+
+class NestedOuterForm(FormFieldSupportMixin, django_forms.Form):
+    nested = True
+
+    other_field = django_forms.CharField()
+    middle = FormField(MiddleForm, prefix='middle')
+
+
+class NestedDataTestCase(TestCase):
+
+    def get_inner_data(self, **kwargs):
+        data = {
+            'inner_field': 'inner_val0',
+            'inner_field_with_inner_form_initial': 'inner_val1',
+            'inner_field_with_outer_form_initial': 'inner_val2',
+        }
+        data.update(kwargs)
+        return data
+
+    def test_form_field_with_nested_data(self):
+        outer_form = forms.OuterForm({
+            'other_field_0': 'val0',
+            'other_field_1': 'val1',
+            'form_field': self.get_inner_data(),
+        }, nested=True)
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['form_field']['inner_field'], 'inner_val0')
+        inner_form = outer_form['form_field'].inner_form
+        self.assertIsNone(inner_form.prefix)
+        self.assertIs(inner_form.data, outer_form.data['form_field'])
+
+    def test_flat_data_ignored_in_nested_mode(self):
+        outer_form = forms.OuterForm({
+            'other_field_0': 'val0',
+            'other_field_1': 'val1',
+            'form_field-inner_field': 'inner_val0',
+        }, nested=True)
+        self.assertFalse(outer_form.is_valid())
+        self.assertIn('form_field', outer_form.errors)
+
+    def test_multi_level_nested_data(self):
+        outer_form = NestedOuterForm({
+            'other_field': 'val',
+            'middle': {
+                'middle_field': 'middle_val',
+                'form_field': self.get_inner_data(),
+            },
+        })
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['middle']['middle_field'], 'middle_val')
+        self.assertEqual(
+            outer_form.cleaned_data['middle']['form_field']['inner_field_with_outer_form_initial'],
+            'inner_val2'
+        )
+        self.assertEqual(outer_form['middle'].data['form_field']['inner_field'], 'inner_val0')
+
+    def test_multi_level_nested_errors(self):
+        outer_form = NestedOuterForm({
+            'other_field': 'val',
+            'middle': {'middle_field': 'middle_val', 'form_field': {}},
+        })
+        self.assertFalse(outer_form.is_valid())
+        self.assertIn('middle', outer_form.errors)
+
+    def test_not_mapping_value(self):
+        outer_form = NestedOuterForm({'other_field': 'val', 'middle': 'not a dict'})
+        self.assertFalse(outer_form.is_valid())
+        self.assertIn('middle', outer_form.errors)
+
+    def test_formset_field_with_list(self):
+        outer_form = forms.OuterFormWithFormSet({
+            'other_field': 'val',
+            'items': [
+                {'name': 'item 0', 'quantity': '1'},
+                {'name': 'item 1', 'quantity': 2, 'DELETE': True},
+                {'name': 'item 2', 'quantity': 3},
+            ],
+        }, nested=True)
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['items'], [
+            {'name': 'item 0', 'quantity': 1, 'DELETE': False},
+            {'name': 'item 2', 'quantity': 3, 'DELETE': False},
+        ])
+
+    def test_formset_field_errors(self):
+        outer_form = forms.OuterFormWithFormSet({
+            'other_field': 'val',
+            'items': [{'name': 'item 0', 'quantity': 'x'}],
+        }, nested=True)
+        self.assertFalse(outer_form.is_valid())
+        self.assertIn('items', outer_form.errors)
+
+
+class NestedModelFormTestCase(TestCase):
+
+    def test_save_create(self):
+        case_form = forms.CaseWithAttachmentsModelForm({
+            'name': 'new case',
+            'application': {'no': 'x0001'},
+            'attachments': [{'name': 'new 0'}, {'name': 'new 1'}],
+        }, nested=True)
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        case = case_form.save()
+        self.assertEqual(case.application.no, 'x0001')
+        self.assertEqual(
+            sorted(case.attachments.values_list('name', flat=True)), ['new 0', 'new 1']
+        )
+
+    def test_save_update(self):
+        case = Case.objects.create(name='case')
+        attachments = [Attachment.objects.create(name='attachment {}'.format(i), case=case)
+                       for i in range(2)]
+        case_form = forms.CaseWithAttachmentsModelForm({
+            'name': 'case',
+            'application': {'no': 'x0002'},
+            'attachments': [
+                {'id': attachments[0].pk, 'name': 'changed 0'},
+                {'id': attachments[1].pk, 'name': 'attachment 1', 'DELETE': True},
+                {'name': 'new 2'},
+            ],
+        }, instance=case, nested=True)
+        self.assertTrue(case_form.is_valid(), case_form.errors)
+        case_form.save()
+        self.assertEqual(
+            sorted(case.attachments.values_list('name', flat=True)), ['changed 0', 'new 2']
+        )
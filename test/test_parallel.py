@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+from django.db import connection, transaction
+from django.db.transaction import TransactionManagementError
+from django.test import TestCase, TransactionTestCase
+
+from form_field_utils.parallel import ParallelValidator, validate_parallel, get_form_path
+
+from . import forms
+
+
+class PayloadsMixin(object):
+
+    def get_payloads(self, count):
+        for i in range(count):
+            payload = {
+                'other_field_0': 'val{}'.format(i),
+                'other_field_1': 'val',
+                'form_field-inner_field': 'inner_val{}'.format(i),
+                'form_field-inner_field_with_inner_form_initial': 'inner_val',
+                'form_field-inner_field_with_outer_form_initial': 'inner_val',
+            }
+            if i % 3 == 0:
+                del payload['form_field-inner_field']
+            yield payload
+
+    def check_results(self, results, count):
+        self.assertEqual(len(results), count)
+        for i, result in enumerate(results):
+            if i % 3 == 0:
+                self.assertFalse(result.is_valid)
+                self.assertIsNone(result.cleaned_data)
+                self.assertEqual(result.errors, {'form_field': {'inner_field': [
+                    {'message': 'This field is required.', 'code': 'required'}
+                ]}})
+            else:
+                self.assertTrue(result.is_valid)
+                self.assertEqual(result.cleaned_data['other_field_0'], 'val{}'.format(i))
+                self.assertEqual(
+                    result.cleaned_data['form_field']['inner_field'], 'inner_val{}'.format(i)
+                )
+
+
+
+class ParallelValidatorTestCase(PayloadsMixin, TestCase):
+
+    def test_form_path(self):
+        self.assertEqual(get_form_path(forms.OuterForm), 'test.forms.OuterForm')
+        self.assertEqual(get_form_path('test.forms.OuterForm'), 'test.forms.OuterForm')
+
+    def test_in_process(self):
+        validator = ParallelValidator(forms.OuterForm, processes=0, chunk_size=4)
+        self.check_results(list(validator.validate(self.get_payloads(10))), 10)
+
+    def test_nested_payloads(self):
+        payloads = [{'other_field': 'val', 'items': [{'name': 'item', 'quantity': '1'}]}]
+        result, = validate_parallel(forms.OuterFormWithFormSet, payloads, processes=0, nested=True)
+        self.assertTrue(result.is_valid, result.errors)
+        self.assertEqual(result.cleaned_data['items'], [{'name': 'item', 'quantity': 1, 'DELETE': False}])
+
+    def test_fork_refused_inside_atomic_block(self):
+        # TestCase本身处于transaction中
+        self.assertTrue(connection.in_atomic_block)
+        with self.assertRaises(TransactionManagementError):
+            validate_parallel(forms.OuterForm, self.get_payloads(3), processes=2, start_method='fork')
+
+    def test_spawn_keeps_connections_open(self):
+        with transaction.atomic():
+            results = validate_parallel(
+                forms.OuterForm, self.get_payloads(7), processes=2, chunk_size=3, start_method='spawn'
+            )
+            self.assertTrue(connection.is_usable())
+        self.check_results(results, 7)
+
+
+class ProcessPoolTestCase(PayloadsMixin, TransactionTestCase):
+    # fork之前需要关闭数据库连接，不能在TestCase的transaction中执行
+
+    def test_process_pool_keeps_input_order(self):
+        results = validate_parallel(forms.OuterForm, self.get_payloads(25), processes=2, chunk_size=3)
+        self.check_results(results, 25)
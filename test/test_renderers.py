@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+import types
+from unittest import mock
+
+from django import forms as django_forms
+from django.forms.boundfield import BoundField
+from django.test import TestCase
+
+from form_field_utils.fields import FormField
+from form_field_utils.forms import FormFieldSupportMixin
+from form_field_utils.renderers import iter_as_table, render_as_table, get_compiled_table
+
+from . import forms
+from .test_formsetfield import management_data
+
+
+class HiddenInnerForm(django_forms.Form):
+    hidden_field = django_forms.CharField(widget=django_forms.HiddenInput)
+
+
+class HiddenOuterForm(FormFieldSupportMixin, django_forms.Form):
+    visible_field = django_forms.CharField(help_text='help <b>text</b>')
+    form_field = FormField(forms.InnerForm, prefix='inner')
+    hidden_field = django_forms.CharField(widget=django_forms.HiddenInput)
+    hidden_form_field = FormField(HiddenInnerForm, prefix='hidden')
+
+    def clean(self):
+        raise django_forms.ValidationError('non field error')
+
+
+class StreamingRendererTestCase(TestCase):
+
+    def assertStreamEqual(self, get_form):
+        chunks = iter_as_table(get_form())
+        self.assertIsInstance(chunks, types.GeneratorType)
+        self.assertEqual(''.join(chunks), str(get_form().as_table()))
+
+    def test_unbound_form(self):
+        self.assertStreamEqual(forms.OuterForm)
+        self.assertStreamEqual(lambda: forms.OuterForm(initial={'form_field': {'inner_field': 'x'}}))
+
+    def test_bound_form_with_errors(self):
+        self.assertStreamEqual(lambda: forms.OuterForm({'other_field_0': 'val0'}))
+
+    def test_hidden_fields_and_non_field_errors(self):
+        self.assertStreamEqual(HiddenOuterForm)
+        self.assertStreamEqual(lambda: HiddenOuterForm({'visible_field': 'x'}))
+
+    def test_only_hidden_fields(self):
+        self.assertStreamEqual(HiddenInnerForm)
+        self.assertStreamEqual(lambda: HiddenInnerForm({}))
+
+    def test_nested_model_form(self):
+        self.assertStreamEqual(forms.CaseWithAttachmentsModelForm)
+
+    def test_formset_field(self):
+        data = management_data('items', 2)
+        data.update({'other_field': 'x', 'items-0-name': 'item', 'items-0-quantity': 'x'})
+        self.assertStreamEqual(lambda: forms.OuterFormWithFormSet(data))
+
+    def test_fallback_for_overridden_rendering(self):
+        class CustomTableForm(HiddenInnerForm):
+            def as_table(self):
+                return 'custom table'
+
+        self.assertEqual(''.join(iter_as_table(CustomTableForm())), 'custom table')
+        self.assertStreamEqual(CustomBoundFieldForm)
+        self.assertIn('custom label', ''.join(iter_as_table(CustomBoundFieldForm())))
+
+    def test_inner_form_streamed_in_chunks(self):
+        chunks = list(forms.OuterForm().iter_as_table())
+        # FormField所在行的开头先于inner form的各行产生
+        start = next(i for i, chunk in enumerate(chunks) if 'for="id_form_field"' in chunk)
+        self.assertNotIn('inner_field', chunks[start])
+        self.assertIn('id_form_field-inner_field', chunks[start + 1])
+
+
+class LabelledInnerForm(django_forms.Form):
+    required_css_class = 'required'
+    error_css_class = 'error'
+
+    name = django_forms.CharField(label='Name?', help_text='help <b>text</b>')
+    note = django_forms.CharField(label='', required=False)
+    code = django_forms.CharField(widget=django_forms.TextInput(attrs={'id': 'custom_id'}))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.initial.get('relabel'):
+            self.fields['name'].label = 'Full name'
+
+
+class LabelledOuterForm(FormFieldSupportMixin, django_forms.Form):
+    title = django_forms.CharField()
+    section = FormField(LabelledInnerForm, prefix='section')
+    hidden_section = FormField(HiddenInnerForm, prefix='hidden')
+
+
+class CustomBoundField(BoundField):
+    def label_tag(self, contents=None, attrs=None, label_suffix=None):
+        return 'custom label'
+
+
+class CustomBoundFieldForm(django_forms.Form):
+    class CustomCharField(django_forms.CharField):
+        def get_bound_field(self, form, field_name):
+            return CustomBoundField(form, self, field_name)
+
+    name = CustomCharField()
+
+
+class CompiledTableTestCase(TestCase):
+
+    def assertRenderEqual(self, get_form):
+        self.assertEqual(render_as_table(get_form()), get_form().as_table())
+        # inner form也使用Django的as_table()渲染作为参照
+        with mock.patch('form_field_utils.renderers.render_as_table', lambda form: form.as_table()):
+            expected = get_form().as_table()
+        self.assertEqual(render_as_table(get_form()), expected)
+
+    def test_same_output_as_as_table(self):
+        self.assertRenderEqual(forms.OuterForm)
+        self.assertRenderEqual(lambda: forms.OuterForm({'other_field_0': 'val0'}))
+        self.assertRenderEqual(HiddenOuterForm)
+        self.assertRenderEqual(lambda: HiddenOuterForm({'visible_field': 'x'}))
+        self.assertRenderEqual(lambda: HiddenInnerForm({}))
+        self.assertRenderEqual(forms.CaseWithAttachmentsModelForm)
+
+    def test_labels_and_css_classes(self):
+        self.assertRenderEqual(LabelledOuterForm)
+        self.assertRenderEqual(lambda: LabelledOuterForm({'section-note': 'x'}))
+        self.assertRenderEqual(lambda: LabelledInnerForm(prefix='p', auto_id='%s_x', label_suffix=' -'))
+        self.assertRenderEqual(lambda: LabelledInnerForm(auto_id=False))
+
+    def test_formset(self):
+        data = management_data('items', 2)
+        data.update({'other_field': 'x', 'items-0-name': 'item', 'items-0-quantity': 'x'})
+        self.assertRenderEqual(lambda: forms.OuterFormWithFormSet(data))
+        formset = forms.OuterFormWithFormSet(data)['items'].inner_form
+        self.assertEqual(render_as_table(formset), formset.as_table())
+
+    def test_labels_computed_once(self):
+        render_as_table(LabelledInnerForm(prefix='once'))
+        with mock.patch.object(BoundField, 'label_tag', side_effect=AssertionError):
+            html = render_as_table(LabelledInnerForm({'once-code': 'x'}, prefix='once'))
+        self.assertEqual(html, LabelledInnerForm({'once-code': 'x'}, prefix='once').as_table())
+
+    def test_fields_changed_in_init(self):
+        form = LabelledInnerForm(initial={'relabel': True})
+        self.assertIsNot(get_compiled_table(form), get_compiled_table(LabelledInnerForm()))
+        self.assertIn('Full name', render_as_table(form))
+        self.assertRenderEqual(lambda: LabelledInnerForm(initial={'relabel': True}))
+
+    def test_custom_bound_field_not_compiled(self):
+        self.assertIsNone(get_compiled_table(CustomBoundFieldForm()))
+        self.assertIn('custom label', render_as_table(CustomBoundFieldForm()))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from unittest import mock
+
+from django import forms as django_forms
+from django.test import TestCase
+
+from form_field_utils.fields import FormField, ModelFormField
+from form_field_utils.forms import FormFieldSupportMixin
+from form_field_utils.schema import get_form_schema
+
+from . import forms
+
+
+class MiddleForm(FormFieldSupportMixin, django_forms.Form):
+    middle_field = django_forms.IntegerField(max_value=10)
+    form_field = FormField(forms.InnerForm, prefix='middle-inner')
+
+
+class DeepOuterForm(FormFieldSupportMixin, django_forms.Form):
+    other_field = django_forms.CharField()
+    middle = FormField(MiddleForm, prefix='middle')
+    optional = FormField(forms.InnerForm, prefix='optional', required=False)
+
+
+class FlatDeepOuterForm(DeepOuterForm):
+    flat_validation = True
+
+
+class LazyMiddleForm(FormFieldSupportMixin, django_forms.Form):
+    middle_field = django_forms.CharField()
+    optional = FormField(forms.ItemForm, prefix='lazy-optional', required=False, lazy=True)
+
+
+class LazyOuterForm(FormFieldSupportMixin, django_forms.Form):
+    middle = FormField(LazyMiddleForm, prefix='lazy')
+
+
+class FlatLazyOuterForm(LazyOuterForm):
+    flat_validation = True
+
+
+class CleanedInnerForm(django_forms.Form):
+    inner_field = django_forms.CharField()
+
+    def clean_inner_field(self):
+        return self.cleaned_data['inner_field'].upper()
+
+
+class FormSchemaTestCase(TestCase):
+
+    def get_data(self, **kwargs):
+        data = {
+            'other_field': 'val',
+            'middle-middle_field': '1',
+            'middle-inner-inner_field': 'inner_val0',
+            'middle-inner-inner_field_with_inner_form_initial': 'inner_val1',
+            'middle-inner-inner_field_with_outer_form_initial': 'inner_val2',
+        }
+        data.update(kwargs)
+        return data
+
+    def test_schema_is_flat_and_cached(self):
+        form_class = DeepOuterForm.base_fields['middle'].get_form_class()
+        schema = get_form_schema(form_class)
+        self.assertIs(get_form_schema(form_class), schema)
+        self.assertEqual(len(schema), 5)
+
+    def test_same_cleaned_data(self):
+        outer_form = DeepOuterForm(self.get_data())
+        flat_form = FlatDeepOuterForm(self.get_data())
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertTrue(flat_form.is_valid(), flat_form.errors)
+        self.assertEqual(flat_form.cleaned_data, outer_form.cleaned_data)
+        self.assertEqual(flat_form.cleaned_data['middle']['middle_field'], 1)
+
+    def test_same_errors(self):
+        data = self.get_data(**{
+            'middle-middle_field': '11',
+            'middle-inner-inner_field': '',
+            'other_field': '',
+        })
+        outer_form = DeepOuterForm(data)
+        flat_form = FlatDeepOuterForm(data)
+        self.assertFalse(flat_form.is_valid())
+        self.assertEqual(flat_form.errors, outer_form.errors)
+        self.assertEqual(
+            [e.code for e in flat_form.errors.as_data()['middle']],
+            [e.code for e in outer_form.errors.as_data()['middle']],
+        )
+        self.assertIn(
+            'Field form_field in FormField: Field inner_field in FormField: This field is required.',
+            flat_form.errors['middle']
+        )
+
+    def test_inner_forms_not_built(self):
+        flat_form = FlatDeepOuterForm(self.get_data())
+        with mock.patch.object(FormField, 'get_form') as get_form:
+            self.assertTrue(flat_form.is_valid(), flat_form.errors)
+        get_form.assert_not_called()
+
+    def test_errors_rendered_by_inner_form(self):
+        flat_form = FlatDeepOuterForm(self.get_data(**{'middle-middle_field': 'x'}))
+        self.assertFalse(flat_form.is_valid())
+        self.assertIn('Enter a whole number.', flat_form.as_table())
+
+    def test_fallback_for_model_form(self):
+        form_field = ModelFormField(forms.ModelInnerForm)
+        self.assertIsNone(get_form_schema(form_field.get_form_class()))
+
+    def test_fallback_for_custom_clean(self):
+        self.assertIsNone(get_form_schema(FormField(CleanedInnerForm).get_form_class()))
+
+        class CleanedOuterForm(FormFieldSupportMixin, django_forms.Form):
+            flat_validation = True
+            form_field = FormField(CleanedInnerForm)
+
+        outer_form = CleanedOuterForm({'inner_field': 'val'})
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertEqual(outer_form.cleaned_data['form_field'], {'inner_field': 'VAL'})
+
+    def test_nested_lazy_field_same_cleaned_data(self):
+        data = {'lazy-middle_field': 'v'}
+        outer_form, flat_form = LazyOuterForm(data), FlatLazyOuterForm(data)
+        self.assertTrue(outer_form.is_valid(), outer_form.errors)
+        self.assertTrue(flat_form.is_valid(), flat_form.errors)
+        self.assertEqual(flat_form.cleaned_data, outer_form.cleaned_data)
+        self.assertEqual(flat_form.cleaned_data['middle'], {'middle_field': 'v', 'optional': {}})
+
+    def test_fallback_for_disabled(self):
+        flat_form = FlatDeepOuterForm(self.get_data(), initial={'middle': {'middle_field': 2}})
+        flat_form.fields['middle'].disabled = True
+        self.assertIsNone(flat_form['middle'].get_flat_schema(flat_form.data))
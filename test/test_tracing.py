@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from django.test import TestCase
+
+from form_field_utils.tracing import use_tracer, get_tracer
+
+from . import forms
+
+
+class TracingTestCase(TestCase):
+
+    def setUp(self):
+        self.events = []
+
+    def test_no_tracer_by_default(self):
+        self.assertIsNone(get_tracer())
+
+    def test_trace_validation_and_render(self):
+        with use_tracer(self.events.append):
+            outer_form = forms.OuterForm({
+                'other_field_0': 'val0',
+                'other_field_1': 'val1',
+                'form_field-inner_field': 'inner_val0',
+            })
+            outer_form.is_valid()
+            outer_form.as_p()
+        self.assertIsNone(get_tracer())
+
+        names = [event.name for event in self.events]
+        self.assertEqual(names, ['get_form', 'to_python', 'widget_render', 'render'])
+        for event in self.events:
+            self.assertEqual(event.path, ('form_field',))
+            self.assertEqual(event.depth, 1)
+            self.assertIs(event.form_class, forms.InnerForm)
+            self.assertGreaterEqual(event.duration, 0)
+
+    def test_trace_save_related(self):
+        with use_tracer(self.events.append):
+            case_form = forms.CaseModelForm({'name': 'Test case', 'no': 'x0001'})
+            case_form.save()
+
+        save_events = [event for event in self.events if event.name == 'save_related']
+        self.assertEqual(
+            [(event.path, event.form_class) for event in save_events],
+            [(('application',), forms.ApplicationModelForm), ((), forms.CaseModelForm)]
+        )
+        self.assertEqual(save_events[0].depth, 1)
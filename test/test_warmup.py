@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+from io import StringIO
+from unittest import mock
+
+from django import forms as django_forms
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command, CommandError
+from django.apps import apps
+from django.test import TestCase, override_settings
+
+from form_field_utils.cache import get_compiled_form_class
+from form_field_utils.fields import FormField
+from form_field_utils.forms import FormFieldSupportMixin
+from form_field_utils.warmup import iter_form_classes, warm_up
+
+from . import forms
+
+
+class WarmUpTestCase(TestCase):
+
+    def test_iter_form_classes(self):
+        form_classes = list(iter_form_classes())
+        self.assertIn(forms.OuterForm, form_classes)
+        self.assertIn(forms.CaseModelForm, form_classes)
+        # 不包括get_compiled_form_class()生成的子类
+        compiled_class = get_compiled_form_class(forms.OuterForm, prefix='outer')
+        self.assertIsNot(compiled_class, forms.OuterForm)
+        self.assertNotIn(compiled_class, list(iter_form_classes()))
+
+    def test_string_reference_resolved(self):
+        class StringRefForm(FormFieldSupportMixin, django_forms.Form):
+            form_field = FormField('test.forms.InnerForm', prefix='form_field')
+
+        field = StringRefForm.base_fields['form_field']
+        self.assertNotIn('form_class', field.__dict__)
+        result, = warm_up([StringRefForm])
+        self.assertIsNone(result.error)
+        self.assertIs(field.__dict__['form_class'], forms.InnerForm)
+        info = get_compiled_form_class.cache_info()
+        field.get_form_class()
+        self.assertEqual(get_compiled_form_class.cache_info().hits, info.hits + 1)
+
+    def test_nested_modelform_prepared(self):
+        # 各个class的准备状态在测试结束后恢复
+        for form_class in (forms.CaseModelForm, forms.ApplicationModelForm):
+            patcher = mock.patch.object(form_class, '_modelform_fields_prepared', False, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        result, = warm_up(['test.forms.CaseModelForm'])
+        self.assertIsNone(result.error)
+        self.assertIs(result.form_class, forms.CaseModelForm)
+        self.assertTrue(forms.CaseModelForm._modelform_fields_prepared)
+        self.assertTrue(forms.ApplicationModelForm._modelform_fields_prepared)
+
+    def test_misconfiguration_reported(self):
+        class ErrorForm(FormFieldSupportMixin, django_forms.Form):
+            form_field = FormField('test.forms.NotExisted')
+
+        results = warm_up([ErrorForm, 'test.forms.NotExisted', forms.OuterForm])
+        self.assertIsInstance(results[0].error, ImproperlyConfigured)
+        self.assertIsInstance(results[1].error, ImportError)
+        self.assertIsNone(results[1].form_class)
+        self.assertIsNone(results[2].error)
+
+
+class WarmUpCommandTestCase(TestCase):
+
+    def test_report_timings(self):
+        out = StringIO()
+        call_command('warm_up_forms', 'test.forms.OuterForm', 'test.forms.CaseModelForm', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].endswith('ms  test.forms.OuterForm'))
+        self.assertTrue(lines[1].endswith('ms  test.forms.CaseModelForm'))
+        self.assertTrue(lines[2].startswith('Warmed up 2 form classes'))
+
+    def test_report_errors(self):
+        out, err = StringIO(), StringIO()
+        with self.assertRaises(CommandError):
+            call_command('warm_up_forms', 'test.forms.NotExisted', stdout=out, stderr=err)
+        self.assertIn('test.forms.NotExisted', err.getvalue())
+
+
+class AppReadyTestCase(TestCase):
+
+    def test_disabled_by_default(self):
+        with mock.patch('form_field_utils.warmup.warm_up') as warm_up_mock:
+            apps.get_app_config('form_field_utils').ready()
+        warm_up_mock.assert_not_called()
+
+    @override_settings(FORM_FIELD_UTILS_WARM_UP=True)
+    def test_warm_up_on_ready(self):
+        app_config = apps.get_app_config('form_field_utils')
+        with mock.patch('form_field_utils.warmup.warm_up', return_value=warm_up([forms.OuterForm])):
+            app_config.ready()
+
+        error_results = warm_up(['test.forms.NotExisted'])
+        with mock.patch('form_field_utils.warmup.warm_up', return_value=error_results):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'test.forms.NotExisted'):
+                app_config.ready()